@@ -0,0 +1,153 @@
+from functools import partial
+import dask.array
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+
+def plan_reductions(data, aggs):
+    """
+    Plan the reductions needed to aggregate ``data``.
+
+    Aggregations are applied in the order they are given, as aggregations
+    of different kinds do not commute, e.g. the maximum over ``member`` of
+    the mean over ``time`` is not the mean over ``time`` of the maximum
+    over ``member``, and NaNs being skipped, neither do means and sums.
+    Neighbouring dims sharing the same aggregation are grouped, so that
+    each group is reduced in a single pass over the data.
+
+    Parameters
+    ----------
+    data: xarray.DataArray
+        The data to be aggregated.
+    aggs: list
+        ``(dim, agg)`` pairs, where ``agg`` is one of the aggregations
+        offered in the Axes pane.
+
+    Returns
+    -------
+    A list of ``(agg, dims)`` pairs, in the order they are to be applied.
+    """
+    plan = []
+    for dim, agg in aggs:
+        if plan and plan[-1][0] == agg:
+            plan[-1][1].append(dim)
+        else:
+            plan.append((agg, [dim]))
+    return plan
+
+
+def reduce_data(data, plan):
+    """
+    Apply a plan created by ``plan_reductions`` to ``data``.
+
+    For dask-backed data this only builds the graph of the whole chain,
+    which is computed in one go when the result is persisted or computed.
+    """
+    for agg, dims in plan:
+        if agg == 'count':
+            data = count_valid(data, dims)
+        else:
+            data = getattr(data, agg)(dims)
+    return data
+
+
+def split_selection(selection, plan):
+    """
+    Split an index selection around the reductions of ``plan``.
+
+    Selecting along a dim which is not reduced commutes with the reductions,
+    so that part of the selection can be applied before them, and only the
+    selected slice needs to be reduced.
+
+    Parameters
+    ----------
+    selection: dict
+        ``{dim: value}`` to be passed to ``sel``.
+    plan: list
+        As returned by ``plan_reductions``.
+
+    Returns
+    -------
+    ``(before, after)``: the selections to apply before and after the
+    reductions.
+    """
+    reduced = {dim for _, dims in plan for dim in dims}
+    before = {dim: val for dim, val in selection.items() if dim not in reduced}
+    after = {dim: val for dim, val in selection.items() if dim in reduced}
+    return before, after
+
+
+def count_valid(data, dims):
+    """
+    Count the non-NaN values of ``data`` along ``dims``.
+
+    Unlike ``(~ data.isnull()).sum(dims)``, this never allocates boolean
+    arrays of the size of ``data``: numpy arrays are scanned one slab at a
+    time, and dask arrays block by block. The counts are returned with the
+    smallest integer dtype (of at least 16 bits) that can hold them.
+
+    Parameters
+    ----------
+    data: xarray.DataArray
+    dims: str or list of str
+        The dims to count along.
+    """
+    dims = [dims] if isinstance(dims, str) else list(dims)
+    total = int(np.prod([data.sizes[dim] for dim in dims]))
+    # apply_ufunc moves the core dims to the end
+    axis = tuple(range(data.ndim - len(dims), data.ndim))
+    return xr.apply_ufunc(_count_valid, data, input_core_dims=[dims],
+                          kwargs={'axis': axis, 'dtype': _count_dtype(total)},
+                          dask='allowed')
+
+
+def _count_dtype(total):
+    for dtype in (np.int16, np.int32):
+        if total <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _count_valid(arr, axis, dtype):
+    if isinstance(arr, dask.array.Array):
+        return dask.array.reduction(
+            arr, partial(_count_valid_block, dtype=dtype), _sum_counts,
+            axis=axis, dtype=dtype)
+    return _count_valid_block(arr, axis, dtype=dtype)
+
+
+def _count_valid_block(arr, axis, keepdims=False, dtype=np.int64):
+    axis = tuple(a % arr.ndim for a in axis)
+    moved = np.moveaxis(arr, axis, range(arr.ndim - len(axis), arr.ndim))
+    lead = moved.ndim - len(axis)
+    total = int(np.prod(moved.shape[lead:]))
+    if arr.dtype.kind not in 'fcmMO' or total == 0:
+        counts = np.full(moved.shape[:lead], total, dtype=dtype)
+    else:
+        # Count NaNs one slab of the first reduced axis at a time, reusing
+        # a single boolean buffer of the size of the slab
+        nulls = np.zeros(moved.shape[:lead], dtype=dtype)
+        buf = np.empty(moved.shape[:lead] + moved.shape[lead + 1:], dtype=bool)
+        rest = tuple(range(lead, buf.ndim))
+        for i in range(moved.shape[lead]):
+            _isnull(moved[(slice(None),) * lead + (i,)], buf)
+            nulls += buf.sum(axis=rest, dtype=dtype)
+        counts = np.subtract(total, nulls, dtype=dtype)
+    if keepdims:
+        counts = np.expand_dims(counts, axis)
+    return counts
+
+
+def _isnull(block, out):
+    kind = block.dtype.kind
+    if kind in 'fc':
+        np.isnan(block, out=out)
+    elif kind in 'mM':
+        np.isnat(block, out=out)
+    else:
+        out[...] = pd.isnull(block)
+
+
+def _sum_counts(counts, axis, keepdims=False):
+    return counts.sum(axis=axis, keepdims=keepdims, dtype=counts.dtype)
@@ -0,0 +1,91 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+def nbytes(obj):
+    """
+    Estimate the memory held by ``obj``, in bytes.
+
+    Works for xarray and numpy objects (and anything else exposing
+    ``nbytes``), falling back to ``sys.getsizeof``.
+    """
+    size = getattr(obj, 'nbytes', None)
+    if size is None:
+        return sys.getsizeof(obj)
+    return int(size)
+
+
+class LRUCache(object):
+    """
+    A mapping which evicts least recently used items to stay within a
+    memory budget.
+
+    Parameters
+    ----------
+    max_bytes: int
+        Upper bound on the summed size of the stored values. A value
+        which is larger than the whole budget is not stored at all.
+    sizeof: callable
+        Function returning the size, in bytes, of a stored value.
+
+    The cache may be shared between threads.
+    """
+
+    def __init__(self, max_bytes=2**30, sizeof=nbytes):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.total_bytes = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.RLock()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = self._data[key]
+            self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self.pop(key)
+            if size > self.max_bytes:
+                return
+            self._data[key] = value
+            self._sizes[key] = size
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                self.pop(next(iter(self._data)))
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        with self._lock:
+            if key not in self._data:
+                if default:
+                    return default[0]
+                raise KeyError(key)
+            self.total_bytes -= self._sizes.pop(key)
+            return self._data.pop(key)
+
+    def keys(self):
+        with self._lock:
+            return list(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.total_bytes = 0
@@ -0,0 +1,98 @@
+import numpy as np
+
+
+def frame_dim(data):
+    """
+    Guess the dim which is usually animated, i.e. time.
+
+    This is a dim named ``time``, or else the first dim whose coordinate
+    holds dates. ``None`` is returned if there is no such dim.
+    """
+    if 'time' in data.dims:
+        return 'time'
+    for dim in data.dims:
+        if dim in data.coords and _is_time(data[dim]):
+            return dim
+    return None
+
+
+def _is_time(coord):
+    if coord.dtype.kind == 'M':
+        return True
+    if coord.dtype.kind == 'O' and coord.size:
+        # cftime dates
+        return hasattr(coord.values.flat[0], 'calendar')
+    return False
+
+
+def auto_chunks(data, frame_dims=None, max_bytes=2**27):
+    """
+    Chunks for which a frame of the dashboard is read as a single chunk.
+
+    Each of ``frame_dims`` gets chunks of one step, while the other dims
+    are kept whole, so that displaying a frame reads exactly one chunk of
+    each variable. If a frame of the largest variable is bigger than
+    ``max_bytes``, the remaining dims are split too: first the dims other
+    than the last two (e.g. depth levels, usually selected too), then the
+    largest of the last two, until a chunk fits in the budget.
+
+    Parameters
+    ----------
+    data: xarray.Dataset or xarray.DataArray
+        Typically opened without chunks, so that nothing is read yet.
+    frame_dims: list of str
+        The dims stepped through by the players. Guessed with ``frame_dim``
+        if not given.
+    max_bytes: int
+        Upper bound on the size of a chunk.
+
+    Returns
+    -------
+    A ``{dim: size}`` mapping, to be passed to ``chunk`` or to
+    ``xarray.open_dataset``.
+    """
+    if frame_dims is None:
+        dim = frame_dim(data)
+        frame_dims = [] if dim is None else [dim]
+    chunks = {dim: (1 if dim in frame_dims else size)
+              for dim, size in data.sizes.items()}
+
+    variables = (data.data_vars.values() if hasattr(data, 'data_vars')
+                 else [data])
+    for var in sorted(variables, key=lambda var: var.nbytes, reverse=True):
+        inner = [dim for dim in var.dims if dim not in frame_dims]
+        split_first = inner[:-2]
+        while _chunk_bytes(var, chunks) > max_bytes:
+            splittable = [dim for dim in split_first if chunks[dim] > 1]
+            if splittable:
+                chunks[splittable[0]] = 1
+                continue
+            splittable = [dim for dim in inner[-2:] if chunks[dim] > 1]
+            if not splittable:
+                break
+            dim = max(splittable, key=lambda dim: chunks[dim])
+            chunks[dim] = -(-chunks[dim] // 2)
+    return chunks
+
+
+def _chunk_bytes(var, chunks):
+    return var.dtype.itemsize * int(np.prod([chunks[dim] for dim in var.dims]))
+
+
+def parse_chunks(spec):
+    """
+    Parse chunks given on the command line.
+
+    ``spec`` is a comma-separated list of ``dim=size``, where ``size`` is an
+    integer, ``-1`` for the whole dim, or ``auto`` to let dask decide, e.g.
+    ``time=1,lat=200,lon=200``.
+    """
+    chunks = {}
+    for item in spec.split(','):
+        dim, sep, size = item.partition('=')
+        dim, size = dim.strip(), size.strip()
+        if not sep or not dim or not size:
+            raise ValueError(f"Invalid chunks {spec!r}: expected "
+                             f"'dim=size' items separated by commas.")
+        chunks[dim] = size if size == 'auto' else int(size)
+    return chunks
@@ -1,17 +1,52 @@
+import argparse
 import sys
 
-def main():
-    usage = "Usage: `xrviz show datafile/url`"
-    if len(sys.argv) ==3 and 'show' == sys.argv[1]:
-        import xarray as xr
-        from .dashboard import Dashboard
 
+def main(argv=None):
+    usage = "xrviz show [--chunks auto|dim=size,...] datafile/url"
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] != 'show':
+        print(f"Usage: `{usage}`")
+        return
+
+    parser = argparse.ArgumentParser(prog='xrviz', usage=usage)
+    parser.add_argument('command', choices=['show'])
+    parser.add_argument('path', metavar='datafile/url')
+    parser.add_argument(
+        '--chunks', default=None,
+        help="Open the data with dask. 'auto' reads each time step as one "
+             "chunk (within --max-chunk-bytes); otherwise a comma-separated "
+             "list of dim=size, e.g. 'time=1,lat=200,lon=200'.")
+    parser.add_argument(
+        '--max-chunk-bytes', default='128MiB',
+        help="Largest chunk created by '--chunks auto' (default: 128MiB).")
+    args = parser.parse_args(argv)
+
+    import xarray as xr
+    from dask.utils import parse_bytes
+    from .chunks import auto_chunks, parse_chunks
+    from .dashboard import Dashboard
+
+    try:
+        max_bytes = parse_bytes(args.max_chunk_bytes)
+        if args.chunks not in (None, 'auto'):
+            chunks = parse_chunks(args.chunks)
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        data = xr.open_dataset(args.path)
+    except:
+        print("Unable to open the datafile/url.", f"Usage: `{usage}`")
+        sys.exit()
+
+    if args.chunks is not None:
+        if args.chunks == 'auto':
+            chunks = auto_chunks(data, max_bytes=max_bytes)
         try:
-            data = xr.open_dataset(sys.argv[2])
-        except:
-            print("Unable to open the datafile/url.", usage)
-            sys.exit()
-        dash = Dashboard(data)
-        dash.show()
-    else:
-        print(usage)
+            # the file is opened lazily, so nothing has been read yet
+            data = data.chunk(chunks)
+        except ValueError as e:
+            parser.error(str(e))
+    dash = Dashboard(data)
+    dash.show()
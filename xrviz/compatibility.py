@@ -32,3 +32,17 @@ try:
 except ImportError:
     logger.debug("Install crick to use tdigest method for finding cmap limits.")
     has_crick_tdigest = False
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    logger.debug("Install scipy to find the tapped cell of curvilinear "
+                 "grids quickly.")
+    cKDTree = None
+
+try:
+    import pyproj
+except ImportError:
+    logger.debug("Install pyproj to project the coordinates of geographic "
+                 "plots with a vectorized transform.")
+    pyproj = None
@@ -1,21 +1,39 @@
 import ast
 import dask
+import dask.array
 import panel as pn
-import pandas as pd
 import numpy as np
+import pandas as pd
 import xarray as xr
 import hvplot.xarray
-import hvplot.pandas
 import holoviews as hv
 from holoviews import streams
+from holoviews.operation.datashader import rasterize
 from bokeh.models import HoverTool
+import asyncio
+import queue
+import threading
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from itertools import cycle
 import numpy
 from .sigslot import SigSlot
 from .control import Control
-from .utils import convert_widget, player_with_name_and_value, is_float, look_for_class
-from .compatibility import ccrs, gv, gf, has_cartopy, logger, has_crick_tdigest
+from .utils import convert_widget, player_with_name_and_value, is_float, look_for_class, is_regular
+from .cache import LRUCache
+from .aggregation import plan_reductions, reduce_data, split_selection
+from .prefetch import FramePrefetcher, PrefetchedFrames, upcoming
+from .limits import quantile_sketch, scale_limits
+from .spatial import NearestCell, is_latitude
+from .lookup import CoordLookup
+from .downsample import minmax_indices
+from .viewport import BoxIndex, range_slice
+from .pyramid import Pyramid, pyramid_factor
+from .raster import rasterize_mesh
+from .region import region_mask, mask_box, region_stats
+from .reproject import mesh_fingerprint, project_mesh, transform_points
+from .compatibility import ccrs, gv, gf, has_cartopy, logger
 
 
 class Dashboard(SigSlot):
@@ -33,6 +51,19 @@ class Dashboard(SigSlot):
         For more details, refer to
         `Set Initial Parameters <../html/set_initial_parameters.html>`_ .
 
+    cache_size: int
+        Upper bound, in bytes, on the memory used to keep aggregated data
+        and prefetched frames between plots (default 1 GiB).
+
+    pyramid_size: int
+        Upper bound, in bytes, on the memory used to keep coarsened levels
+        of the rasterized frames, see ``pyramid`` (default 256 MiB). ``0``
+        disables them.
+
+    projection_size: int
+        Upper bound, in bytes, on the memory used to keep projected
+        coordinates, see ``projected_meshes`` (default 256 MiB).
+
     Attributes
     ----------
 
@@ -55,17 +86,66 @@ class Dashboard(SigSlot):
     8. clear_series_button:
             A ``pn.widgets.Button`` to clear the `taps_graph` and
             `series_graph`.
+    9. agg_cache:
+            A ``LRUCache`` of aggregated data, so that re-plotting does not
+            repeat the aggregations.
+    10. prefetcher:
+            A ``FramePrefetcher`` computing the next frames of animations
+            in the background, and keeping them in ``agg_cache``.
+    11. cmap_sketches:
+            A ``LRUCache`` of quantile sketches of the plotted data, from
+            which colormap limits are derived when the color scale changes.
+    12. nearest_cells:
+            A dict of ``NearestCell`` indexes, keyed by the ``(x, y)`` pair of
+            multi-dimensional coordinates, to find the tapped cell.
+    13. series_cache:
+            A ``LRUCache`` of the series extracted at taps and over
+            regions, so that tapping a location again, or going back to a
+            selection, reads nothing.
+    14. regions:
+            The boxes and polygons selected on the graph, as ``(bounds,
+            geometry, color)``, over which the statistics are plotted.
+    15. regular_coords:
+            A dict telling, for each coordinate plotted along ``x`` or
+            ``y``, whether it is an evenly spaced dimension coordinate, see
+            ``plot_kind``.
+    16. viewport_indexes:
+            A dict of ``BoxIndex`` indexes, keyed by the ``(x, y)`` pair of
+            multi-dimensional coordinates, to find the cells in view.
+    17. pyramid:
+            A ``Pyramid`` of the rasterized frames, coarsened by block
+            means, from which zoomed-out views are rasterized.
+    18. projected_meshes:
+            A ``LRUCache`` of the ``x`` and ``y`` coordinates of geographic
+            plots, projected to the projection of the graph, so that
+            frames and plots with the same coordinates and projection are
+            placed on them without projecting again, see
+            ``projected_mesh``.
     """
-    def __init__(self, data, initial_params={}):
+    def __init__(self, data, initial_params={}, cache_size=2**30,
+                 pyramid_size=2**28, projection_size=2**28):
         super().__init__()
         if not isinstance(data, xr.core.dataarray.DataWithCoords):
             raise ValueError("Input should be an xarray data object, not %s" % type(data))
         self.set_data(data)
         self.initial_params = initial_params
+        self.agg_cache = LRUCache(max_bytes=cache_size)
+        self.prefetcher = FramePrefetcher(self.agg_cache)
+        self.cmap_sketches = LRUCache(max_bytes=2**20)
+        self.nearest_cells = {}
+        self.series_cache = LRUCache(max_bytes=2**26)
+        self.regular_coords = {}
+        self.viewport_indexes = {}
+        self.pyramid = (Pyramid(LRUCache(max_bytes=pyramid_size))
+                        if pyramid_size else None)
+        self.projected_meshes = LRUCache(max_bytes=projection_size)
+        self._projected = None
         self.control = Control(self.data)
         self.plot_button = pn.widgets.Button(name='Plot', width=200,
                                              disabled=True)
         self.index_selectors = []
+        self.selector_dims = []
+        self._frame_task = None
         self.graph = pn.Spacer(name='Graph')
         self.taps_graph = hv.Points([])
         self.series_graph = pn.Row(pn.Spacer(name='Series Graph'))
@@ -103,7 +183,18 @@ class Dashboard(SigSlot):
 
         self.control.setup_initial_values(self.initial_params)
         self.taps = []
+        self._taps_axes = None
+        self._series_pool = ThreadPoolExecutor(max_workers=1)
+        self._series_swaps = queue.SimpleQueue()
+        self._series_lock = threading.RLock()
+        self._series_generation = 0
+        self._series_maps = []
         self.tap_stream = streams.Tap(transient=True)
+        self.regions = []
+        self.region_stream = streams.BoundsXY(transient=True)
+        self.lasso_stream = streams.Lasso(transient=True)
+        self.region_stream.add_subscriber(self.select_region)
+        self.lasso_stream.add_subscriber(self.select_region)
         colors = ['#60fffc', '#6da252', '#ff60d4', '#ff9400', '#f4e322',
                   '#229cf4', '#af9862', '#629baf', '#7eed5a', '#e29ec8',
                   '#ff4300']
@@ -117,9 +208,9 @@ class Dashboard(SigSlot):
         """
         if not self.clear_series_button.disabled:
             self.series_graph[0] = pn.Spacer(name='Series Graph')
-            self.series = hv.Points([]).opts(frame_height=self.kwargs['frame_height'],
-                                             frame_width=self.kwargs['frame_width'])
+            self._reset_series()
             self.taps.clear()
+            self.regions.clear()
             self.clear_points.event(clear=True)
 
     def _link_aggregation_selectors(self, *args):
@@ -150,11 +241,21 @@ class Dashboard(SigSlot):
             for selector in self.index_selectors:
                 del selector
         self.index_selectors = []
+        self.selector_dims = []
+        self._frame_task = None
+        self.prefetcher.cancel()
         self.output[1].clear()  # clears Index_selectors
         self.series_graph[0] = pn.Spacer(name='Series Graph')
-        self.series = hv.Points([]).opts(frame_height=self.kwargs['frame_height'],
-                                         frame_width=self.kwargs['frame_width'])
-        self.taps.clear()
+        self._reset_series()
+        # Taps and regions on the same axes and projection are kept, and
+        # their series are extracted again for the new plot
+        self._projected = self._geo_projection()
+        taps_axes = (self.kwargs['x'], self.kwargs['y'],
+                     self._projected and self._projected[2])
+        if taps_axes != self._taps_axes:
+            self.taps.clear()
+            self.regions.clear()
+        self._taps_axes = taps_axes
         self.control.fields.connect('extract_along', self.clear_series)
 
         are_var_coords = self.kwargs['are_var_coords']
@@ -166,11 +267,10 @@ class Dashboard(SigSlot):
                           'frame_width': self.kwargs['frame_width'],
                           'cmap': self.kwargs['cmap'],
                           'colorbar': self.kwargs['colorbar'],
-                          'rasterize': self.kwargs['rasterize']}
-            color_scale = self.kwargs['color_scale']
-            dims_to_agg = self.kwargs['dims_to_agg']
+                          'rasterize': self.kwargs['rasterize'],
+                          # to draw the regions of `select_region`
+                          'tools': ['box_select', 'lasso_select']}
             use_all_data = self.kwargs['compute min/max from all data']
-            sel_data = self.data[self.var]
 
             if has_cartopy:
                 is_geo = self.kwargs['is_geo']
@@ -199,40 +299,62 @@ class Dashboard(SigSlot):
 
                     feature_map = gv.Overlay([getattr(gf, feat) for feat in self.kwargs['features'] if feat is not 'None'])
 
-            for dim in dims_to_agg:
-                if self.kwargs[dim] == 'count':
-                    sel_data = (~ sel_data.isnull()).sum(dim)
-                else:
-                    agg = self.kwargs[dim]
-                    sel_data = getattr(sel_data, agg)(dim)
-
-            if self.var in list(sel_data.coords):  # When a var(coord) is plotted wrt itself
-                sel_data = sel_data.to_dataset(name=f'{sel_data.name}_')
-
-            if color_scale is not 'linear':
-                sel_data = getattr(numpy, color_scale)(sel_data)  # Color Scaling
-
-            if not use_all_data:
-                # sel the values at first step, to use for cmap limits
-                sels = {dim: 0 for dim in self.kwargs['dims_to_select_animate']}
-                sel_data_for_cmap = sel_data.isel(**sels, drop=True)
-            else:
-                sel_data_for_cmap = sel_data
+            unscaled_data = self.aggregate_data()
+            # hvplot selects the frames along these dims
+            frame_dims = self.kwargs['dims_to_select_animate']
+            first_frame = None
 
             cmin, cmax = self.kwargs['cmap lower limit'], self.kwargs['cmap upper limit']
             cmin, cmax = (cmin, cmax) if is_float(cmin) and is_float(cmax) else ('', '')
 
             # It is better to set initial values as 0.1,0.9 rather than
             # 0,1(min, max) to get a color balance graph
-            c_lim_lower, c_lim_upper = (
-                (float(cmin), float(cmax)) if cmin and cmax
-                else find_cmap_limits(sel_data_for_cmap))
+            if cmin and cmax:
+                c_lim_lower, c_lim_upper = float(cmin), float(cmax)
+            else:
+                cmap_key = self._aggregation_task({})[0]
+                if not use_all_data:
+                    # sel the values at first step, to use for cmap limits
+                    sels = {dim: 0 for dim in frame_dims}
+                    cmap_key += ('first step',)
+                else:
+                    sels = {}
+                cmap_data = unscaled_data.isel(**sels, drop=True)
+                if (sels or not frame_dims) \
+                        and cmap_key + self._sketch_options() not in self.cmap_sketches \
+                        and isinstance(cmap_data.data, dask.array.Array):
+                    # The limits come from the first frame, which is about
+                    # to be displayed as well: read it once for both
+                    cmap_data = first_frame = cmap_data.compute()
+                (c_lim_lower, c_lim_upper), limits_error = self._cmap_limits(
+                    cmap_key, lambda: cmap_data)
+
+            if first_frame is not None and not frame_dims:
+                sel_data = self._color_scale(first_frame)
+            else:
+                sel_data = self._color_scale(unscaled_data, frame_dims)
+
+            if self.var in list(sel_data.coords):  # When a var(coord) is plotted wrt itself
+                sel_data = sel_data.to_dataset(name=f'{sel_data.name}_')
 
             color_range = {sel_data.name: (c_lim_lower, c_lim_upper)}
 
             if not cmin:  # if user left blank or initial values are empty
                 self.control.style.lower_limit.value = str(round(c_lim_lower, 5))
                 self.control.style.upper_limit.value = str(round(c_lim_upper, 5))
+                self.control.style.limits_error.value = describe_limits_error(limits_error)
+
+            if (frame_dims and isinstance(sel_data, xr.DataArray) and
+                    isinstance(sel_data.data, dask.array.Array)):
+                # serve the frames selected by hvplot through the prefetcher,
+                # which players also use to compute the next frames ahead
+                frames = PrefetchedFrames(sel_data, frame_dims,
+                                          self.prefetcher)
+                if first_frame is not None:
+                    frames.store({dim: 0 for dim in frame_dims},
+                                 numpy.asarray(self._color_scale(first_frame)))
+                self._frame_task = frames.task
+                sel_data = frames.to_xarray()
 
             assign_opts = {dim: self.data[dim] for dim in sel_data.dims}
             # Following tasks are happening here:
@@ -244,12 +366,24 @@ class Dashboard(SigSlot):
             # lower and upper limits
             # 4. active_tools: activate the tools required such as 'wheel_zoom',
             # 'pan'
-            graph = sel_data.assign_coords(
-                **assign_opts).hvplot.quadmesh(
-                **graph_opts).redim.range(**color_range).opts(
+            sel_data = sel_data.assign_coords(**assign_opts)
+            if self._projected is not None:
+                # geoviews would project the coordinates of every frame:
+                # the frames are placed on the mesh projected once instead
+                mesh = self.projected_mesh()
+                x, y = ('projected_' + self.kwargs[axis] for axis in 'xy')
+                sel_data = sel_data.assign_coords({x: mesh['x'],
+                                                   y: mesh['y']})
+                projection = self._projected[1]
+                graph_opts.update(x=x, y=y, crs=projection,
+                                  projection=projection, project=False)
+            graph = self._plot_graph(sel_data, graph_opts)
+            graph = graph.redim.range(**color_range).opts(
                 active_tools=['wheel_zoom', 'pan'])
 
             self.tap_stream.source = graph
+            self.region_stream.source = graph
+            self.lasso_stream.source = graph
 
             if has_cartopy and is_geo:
                 graph = (
@@ -276,10 +410,13 @@ class Dashboard(SigSlot):
                     selector = pn.widgets.DiscretePlayer(name=dim,
                                                          value=ops[0],
                                                          options=ops)
+                    selector.param.watch(self._prefetch_frames, 'value')
                 self.index_selectors.append(selector)
+                self.selector_dims.append(dim)
                 self._register(selector, selector.name)
                 self.connect(selector.name, self.create_indexed_graph)
 
+            self._frame_task = self._indexed_frame_task
             self.create_indexed_graph()
             for selector in self.index_selectors:
                 if isinstance(selector, pn.widgets.Select):
@@ -288,6 +425,12 @@ class Dashboard(SigSlot):
                     player = player_with_name_and_value(selector)
                     self.output[1].append(player)
 
+        if self.clear_series_button.disabled:
+            self.taps.clear()
+            self.regions.clear()
+        else:
+            self.redraw_series()
+
     def create_indexed_graph(self, *args):
         """
         Creates a graph for the dimensions selected in widgets `x` and `y`.
@@ -306,57 +449,56 @@ class Dashboard(SigSlot):
                       'frame_width': self.kwargs['frame_width'],
                       'cmap': self.kwargs['cmap'],
                       'colorbar': self.kwargs['colorbar'],
-                      'rasterize': self.kwargs['rasterize']}
-        dims_to_agg = self.kwargs['dims_to_agg']
-        color_scale = self.kwargs['color_scale']
+                      'rasterize': self.kwargs['rasterize'],
+                      'tools': ['box_select', 'lasso_select']}
         use_all_data = self.kwargs['compute min/max from all data']
 
-        sel_data = self.data[self.var]
-
-        for dim in dims_to_agg:
-            if self.kwargs[dim] == 'count':
-                sel_data = (~ sel_data.isnull()).sum(dim)
-            else:
-                agg = self.kwargs[dim]
-                sel_data = getattr(sel_data, agg)(dim)
+        # The index selection commutes with the aggregations, so only the
+        # slice being displayed is aggregated
+        unscaled_data = self.aggregate_data(selection)
+        if isinstance(unscaled_data.data, dask.array.Array):
+            # Only the displayed frame is left: read it once, for both the
+            # plot and its cmap limits
+            unscaled_data = unscaled_data.compute()
+        sel_data = self._color_scale(unscaled_data)
 
         # rename the sel_data in case it is a coordinate, because we
         # cannot create a Dataset from a DataArray with the same name
         #  as one of its coordinates
         if sel_data.name in self.data.coords:
-                sel_data = sel_data.to_dataset(name=f'{sel_data.name}_')
-
-        if not use_all_data:  # do the selection earlier
-            sel_data = sel_data.sel(**selection, drop=True)
-
-        if color_scale is not 'linear':
-            sel_data = getattr(numpy, color_scale)(sel_data)  # Color Scaling
+            sel_data = sel_data.to_dataset(name=f'{sel_data.name}_')
 
         cmin, cmax = self.kwargs['cmap lower limit'], self.kwargs['cmap upper limit']
         cmin, cmax = (cmin, cmax) if is_float(cmin) and is_float(cmax) else ('', '')
 
         # It is better to set initial values as 0.1,0.9 rather than
         # 0,1(min, max) to get a color balance graph
-        c_lim_lower, c_lim_upper = (
-            (float(cmin), float(cmax)) if cmin and cmax
-            else find_cmap_limits(sel_data))
+        if cmin and cmax:
+            c_lim_lower, c_lim_upper = float(cmin), float(cmax)
+        else:
+            cmap_selection = {} if use_all_data else selection
+            get_data = (partial(self.aggregate_data, cmap_selection)
+                        if cmap_selection != selection
+                        else lambda: unscaled_data)
+            (c_lim_lower, c_lim_upper), limits_error = self._cmap_limits(
+                self._aggregation_task(cmap_selection)[0], get_data)
 
         color_range = {sel_data.name: (c_lim_lower, c_lim_upper)}
 
         if not cmin:  # if user left blank or initial values are empty
             self.control.style.lower_limit.value = str(round(c_lim_lower, 5))
             self.control.style.upper_limit.value = str(round(c_lim_upper, 5))
-
-        if use_all_data:  # do the selection later
-            sel_data = sel_data.sel(**selection, drop=True)
+            self.control.style.limits_error.value = describe_limits_error(limits_error)
 
         assign_opts = {dim: self.data[dim] for dim in sel_data.dims}
-        graph = sel_data.assign_coords(
-            **assign_opts).hvplot.quadmesh(**graph_opts).redim.range(
+        graph = self._plot_graph(sel_data.assign_coords(**assign_opts),
+                                 graph_opts).redim.range(
             **color_range).opts(active_tools=['wheel_zoom', 'pan'])
         self.graph = graph
         if len(self.data[self.var].dims) > 2 and self.kwargs['extract along']:
             self.tap_stream.source = graph
+            self.region_stream.source = graph
+            self.lasso_stream.source = graph
             self.taps_graph = hv.DynamicMap(
                 self.create_taps_graph,
                 streams=[self.tap_stream, self.clear_points])
@@ -366,6 +508,311 @@ class Dashboard(SigSlot):
             self.output[0] = self.graph
             self.clear_series_button.disabled = True
 
+    def plot_kind(self):
+        """
+        The hvplot method to plot the graph with.
+
+        ``'image'`` if ``x`` and ``y`` are both evenly spaced dimension
+        coordinates, as an Image is much cheaper to rasterize and to send
+        than a QuadMesh, or ``'quadmesh'`` otherwise, e.g. for curvilinear
+        grids. Whether a coordinate is regular is kept in
+        ``regular_coords``.
+        """
+        for coord in (self.kwargs['x'], self.kwargs['y']):
+            regular = self.regular_coords.get(coord)
+            if regular is None:
+                values = self.data[coord]
+                regular = values.dims == (coord,) and is_regular(values)
+                self.regular_coords[coord] = regular
+            if not regular:
+                return 'quadmesh'
+        return 'image'
+
+    def _plot_graph(self, sel_data, graph_opts):
+        # hvplot would rasterize whole frames on every zoom and pan, so the
+        # frames are sliced to the viewport before being rasterized here.
+        # Curvilinear meshes are rasterized in parallel, see `rasterize_mesh`.
+        # Projected plots are left to hvplot, as their viewport is not in
+        # the coordinates of the data.
+        kind = 'quadmesh' if self._projected is not None else self.plot_kind()
+        plot = getattr(sel_data.hvplot, kind)
+        if not graph_opts['rasterize'] or graph_opts.get('geo'):
+            return plot(**graph_opts)
+        graph = plot(**dict(graph_opts, rasterize=False))
+        x, y = self.data[self.kwargs['x']], self.data[self.kwargs['y']]
+        if x.ndim == 2 and x.dims == y.dims:
+            graph = graph.apply(self._rasterize_mesh,
+                                streams=[streams.RangeXY(), streams.PlotSize()])
+        else:
+            graph = rasterize(graph.apply(self._viewport,
+                                          streams=[streams.RangeXY()]))
+        return graph.opts(
+            cmap=graph_opts['cmap'], colorbar=graph_opts['colorbar'],
+            frame_height=graph_opts['frame_height'],
+            frame_width=graph_opts['frame_width'],
+            title=graph_opts['title'],
+            tools=['hover'] + graph_opts['tools'])
+
+    def _viewport(self, element, x_range=None, y_range=None):
+        # The frame `element` in the viewport, from the coarsest level of
+        # the pyramid which still has more cells than the graph has pixels
+        data = element.data
+        dims = data[element.vdims[0].name].dims
+        box = self.viewport_box(x_range, y_range)
+        box = {dim: box[dim] for dim in dims if dim in box}
+        factor = 1
+        if self.pyramid is not None:
+            sizes = [len(range(data.sizes[dim])[box.get(dim, slice(None))])
+                     for dim in dims]
+            factor = pyramid_factor(sizes, max(self.kwargs['frame_width'],
+                                               self.kwargs['frame_height']))
+        if factor > 1:
+            # frames of indexed graphs are selected with `drop=True`, so
+            # they are told apart by the values of the index selectors
+            frame = tuple((name, coord.values.item())
+                          for name, coord in data.coords.items()
+                          if coord.ndim == 0) + tuple(
+                (dim, selector.value) for dim, selector in
+                zip(self.selector_dims, self.index_selectors))
+            key = self._aggregation_task({})[0] + (
+                self.kwargs['x'], self.kwargs['y'],
+                self.kwargs['color_scale'], frame)
+            data = self.pyramid.level(data, key, dims, factor)
+            box = {dim: slice(sl.start // factor, -(-sl.stop // factor))
+                   for dim, sl in box.items()}
+        elif not box:
+            return element
+        data = data.isel(box)
+        if isinstance(element, hv.Image):
+            return element.clone(data, bounds=None)
+        return element.clone(data)
+
+    def _rasterize_mesh(self, element, x_range=None, y_range=None,
+                        width=None, height=None, scale=1):
+        element = self._viewport(element, x_range, y_range)
+        x, y, var = self.kwargs['x'], self.kwargs['y'], element.vdims[0].name
+        raster = rasterize_mesh(
+            element.data[var], x, y, width or self.kwargs['frame_width'],
+            height or self.kwargs['frame_height'], x_range, y_range)
+        return hv.Image(raster.rename(var), kdims=[x, y], vdims=[var])
+
+    def viewport_box(self, x_range, y_range):
+        """
+        The ``isel`` slices of the cells of the graph in a viewport, with a
+        margin around it, so that only them are read and rasterized.
+
+        The labels of monotonic 1-D ``x`` and ``y`` are found by binary
+        search, see ``range_slice``, and the cells of multi-dimensional
+        ones with a ``BoxIndex``, kept in ``viewport_indexes``. An empty
+        dict is returned if the whole graph is to be kept.
+        """
+        if x_range is None or y_range is None:
+            return {}
+        names = (self.kwargs['x'], self.kwargs['y'])
+        x, y = (self.data[name] for name in names)
+        if x.ndim == 1 and y.ndim == 1 and x.dims != y.dims:
+            box = {}
+            for name, coord, (lower, upper) in zip(names, (x, y),
+                                                   (x_range, y_range)):
+                index = self.coord_lookup.index(name)
+                if not (index.is_monotonic_increasing or
+                        index.is_monotonic_decreasing):
+                    return {}
+                box[coord.dims[0]] = range_slice(index, lower, upper)
+            return box
+        index = self.viewport_indexes.get(names)
+        if index is None:
+            index = self.viewport_indexes[names] = BoxIndex(x, y)
+        return index.query(x_range, y_range)
+
+    def _geo_projection(self):
+        # The crs of the data and the projection of the graph, when a
+        # geographic plot projects its coordinates, with the names and
+        # params identifying them
+        if not (has_cartopy and self.kwargs['are_var_coords'] and
+                self.kwargs['is_geo']):
+            return None
+        names = (self.kwargs['crs'], self.kwargs['crs params'])
+        crs = getattr(ccrs, names[0])(**process_proj_params(names[1]))
+        if self.kwargs['basemap'] is not None:
+            # hvplot projects to Web Mercator, the projection of the tiles
+            return crs, ccrs.GOOGLE_MERCATOR, names + ('GOOGLE_MERCATOR', '')
+        if not self.kwargs['projection']:
+            return None
+        names += (self.kwargs['projection'], self.kwargs['projection params'])
+        projection = getattr(ccrs, names[2])(**process_proj_params(names[3]))
+        return crs, projection, names
+
+    def projected_mesh(self):
+        """
+        The ``x`` and ``y`` coordinates of a geographic graph, projected
+        from its crs to its projection with ``project_mesh``.
+
+        Meshes are kept in ``projected_meshes``, keyed by a fingerprint of
+        the coordinates, and by the names and params of the crs and of the
+        projection, so that the coordinates are projected once for all
+        frames, and again only if one of them changes.
+
+        Returns
+        -------
+        A ``xarray.Dataset`` with the projected ``x`` and ``y``, or ``None``
+        if the graph is not projected.
+        """
+        if self._projected is None:
+            return None
+        crs, projection, names = self._projected
+        x, y = self.data[self.kwargs['x']], self.data[self.kwargs['y']]
+        key = (mesh_fingerprint(x, y),) + names
+        mesh = self.projected_meshes.get(key)
+        if mesh is None:
+            mesh = self.projected_meshes[key] = project_mesh(x, y, crs,
+                                                             projection)
+        return mesh
+
+    def _color_scale(self, sel_data, frame_dims=()):
+        """
+        Apply the color scaling selected in the Style pane to ``sel_data``.
+
+        If ``sel_data`` holds several frames along ``frame_dims``, it is
+        scaled lazily, one frame at a time as frames are displayed, rather
+        than allocating a scaled copy of the whole array.
+        """
+        color_scale = self.kwargs['color_scale']
+        if color_scale == 'linear':
+            return sel_data
+        if frame_dims and not isinstance(sel_data.data, dask.array.Array):
+            sel_data = sel_data.chunk({dim: 1 for dim in frame_dims})
+        if sel_data.dtype.kind in 'iu':  # e.g. counts, to avoid overflows
+            sel_data = sel_data.astype('float64')
+        return getattr(numpy, color_scale)(sel_data)  # Color Scaling
+
+    def _sketch_options(self):
+        return (self.kwargs['cmap sample size'], self.kwargs['cmap exact size'])
+
+    def _cmap_limits(self, key, get_data):
+        """
+        Initial colormap limits for the color-scaled data, and the bound on
+        their error in rank, see ``quantile_sketch``.
+
+        The ``quantile_sketch`` of the unscaled data, given by ``get_data``,
+        is kept in ``cmap_sketches`` under ``key`` and the sampling options
+        of the Style pane. When only the color scale changes, the new
+        limits are derived from it without reading the data again, see
+        ``scale_limits``.
+        """
+        sample_size, max_exact_size = options = self._sketch_options()
+        key = key + options
+        cached = self.cmap_sketches.get(key)
+        if cached is None:
+            cached = quantile_sketch(get_data(), sample_size=sample_size,
+                                     max_exact_size=max_exact_size,
+                                     return_error=True)
+            self.cmap_sketches[key] = cached
+        sketch, error = cached
+        limits = scale_limits(sketch, self.kwargs['color_scale'])
+        if limits is None:  # the color scale is not monotonic over the data
+            sketch, error = quantile_sketch(
+                self._color_scale(get_data()), sample_size=sample_size,
+                max_exact_size=max_exact_size, return_error=True)
+            limits = list(sketch[1:3])
+        return limits, error
+
+    def aggregate_data(self, selection={}):
+        """
+        Apply the aggregations selected in the Axes pane to the variable.
+
+        An index ``selection`` (``{dim: value}``) on dims which are not
+        aggregated commutes with the aggregations, so it is applied first
+        and only the selected slice is reduced, see ``split_selection``.
+
+        Dims sharing an aggregation are reduced together, see
+        ``plan_reductions``. Results are kept in ``agg_cache``, keyed by the
+        variable, the aggregation chosen for each dim, the coordinates set
+        and the selection, so that re-plotting, moving a selector or
+        changing a style option reuses the reduction. Dask-backed results
+        are persisted before caching if they fit in ``agg_cache``, and are
+        left lazy otherwise, or computed in the case of a slice.
+        Slices which are being prefetched are waited for rather than
+        computed again.
+        """
+        sel_data = self.data[self.var]
+        if not self.kwargs['dims_to_agg'] and not (
+                selection and isinstance(sel_data.data, dask.array.Array)):
+            return sel_data.sel(**selection, drop=True) if selection else sel_data
+
+        key, compute, after = self._aggregation_task(selection)
+        whole = self.agg_cache.get(key[:-1] + ((),))
+        if whole is not None:  # the whole variable has been aggregated
+            return whole.sel(**selection, drop=True) if selection else whole
+
+        sel_data = self.prefetcher.get(key, compute)
+        return sel_data.sel(**after, drop=True) if after else sel_data
+
+    def _aggregation_task(self, selection):
+        # Returns the cache key of the aggregation at `selection`, the
+        # function computing it, and the part of `selection` which is left
+        # to be applied afterwards.
+        sel_data = self.data[self.var]
+        aggs, plan = self._aggregation_plan()
+        before, after = split_selection(selection, plan)
+        key = (self.var, aggs, tuple(sorted(self.data.coords)),
+               tuple(sorted(before.items())))
+        compute = partial(_compute_aggregation,
+                          sel_data.sel(**before, drop=True), plan,
+                          is_slice=bool(before),
+                          max_bytes=self.agg_cache.max_bytes)
+        return key, compute, after
+
+    def _aggregation_plan(self):
+        # The aggregations selected in the Axes pane, as `(dim, agg)`
+        # pairs, and the reductions applying them
+        aggs = tuple((dim, self.kwargs[dim])
+                     for dim in self.kwargs['dims_to_agg'])
+        return aggs, plan_reductions(self.data[self.var], aggs)
+
+    def _indexed_frame_task(self, selection):
+        # The frames of create_indexed_graph are worth prefetching only if
+        # they need to be aggregated or read from dask
+        sel_data = self.data[self.var]
+        if (not self.kwargs['dims_to_agg'] and
+                not isinstance(sel_data.data, dask.array.Array)):
+            return None
+        key, compute, _ = self._aggregation_task(selection)
+        if key[:-1] + ((),) in self.agg_cache:
+            return None
+        return key, compute
+
+    def _prefetch_frames(self, event):
+        """
+        Compute the next frames of a player in the background.
+
+        Frames are computed in the direction the player is moving, keeping
+        the values of the other selectors. Queued frames which are no
+        longer ahead of the player are dropped.
+        """
+        if self._frame_task is None or event.obj not in self.index_selectors:
+            return
+        player = event.obj
+        options = player.options
+        options = list(options.values() if isinstance(options, dict) else options)
+        try:
+            old, new = options.index(event.old), options.index(event.new)
+        except ValueError:
+            return
+        step = getattr(player, 'direction', 0) or (-1 if new < old else 1)
+        loop = getattr(player, 'loop_policy', None) == 'loop'
+
+        selection = dict(zip(self.selector_dims,
+                             [sel.value for sel in self.index_selectors]))
+        dim = self.selector_dims[self.index_selectors.index(player)]
+        tasks = []
+        for pos in upcoming(new, len(options), step, self.prefetcher.ahead,
+                            loop):
+            task = self._frame_task(dict(selection, **{dim: options[pos]}))
+            if task is not None:
+                tasks.append(task)
+        self.prefetcher.prefetch(tasks)
+
     def create_taps_graph(self, x, y, clear=False):
         """
         Create an output layer in the graph which responds to taps
@@ -383,12 +830,14 @@ class Dashboard(SigSlot):
 
         # Choose between gv.Points and hv.Points
         if is_geo and geo_disabled is False:
-            tapped_map = gv.Points(self.taps, vdims=['z'])
+            # taps are in the projection of the graph, if it is projected
+            crs = {} if self._projected is None else {'crs': self._projected[1]}
+            tapped_map = gv.Points(self.taps, vdims=['z'], **crs)
         else:
             tapped_map = hv.Points(self.taps, vdims=['z'])
         tapped_map.opts(color='z', marker='triangle', line_color='black',
                         size=8)
-        self.series_graph[0] = self.create_series_graph(x, y, color, clear)
+        self.create_series_graph(x, y, color, clear)
         return tapped_map
 
     def create_series_graph(self, x, y, color, clear=False):
@@ -409,81 +858,408 @@ class Dashboard(SigSlot):
 
                 ``2b``: Both are 2-dimensional with same dimensions.
 
-                ``2c``: Both are 2-dimensional with different dims or are multi-dimcoordinates. Here we are unable to extract.
+                ``2c``: Both are 2-dimensional with different dims or are multi-dimcoordinates.
             Note that ``Case 1`` and ``Case 2a`` can be handled with the same
-            code.
+            code, and so can ``Case 2b`` and ``Case 2c``, which find the
+            nearest cell with ``nearest_cell``.
+
+        The series is read on a worker thread, so that the interface stays
+        responsive meanwhile: an empty placeholder is plotted until it is
+        ready, see ``wait_for_series``.
         """
         extract_along = self.control.kwargs['extract along']
         if None not in [x, y] and extract_along:
             color = self.taps[-1][-1] if self.taps[-1][-1] else None
-            other_dims = [dim for dim in self.kwargs['remaining_dims'] if
-                          dim is not extract_along]
-
-            # to use the value selected in index selector for selecting
-            # data to create series. In case of aggregation, plot is
-            # created along 0th val of the dim.
-            if len(other_dims):
-                other_dim_sels = {}
-                for dim in other_dims:
-                    dim_found = False
-                    for dim_sel in self.index_selectors:
-                        long_name = self.data[dim].long_name if hasattr(
-                            self.data[dim], 'long_name') else None
-                        if dim_sel.name == dim or dim_sel.name == long_name:
-                            val = dim_sel.value
-                            other_dim_sels.update({dim: val})
-                            dim_found = True
-                    if not dim_found:  # when dim is used for aggregation
-                        val = self.data[dim][0].values
-                        other_dim_sels.update({dim: val})
-
-            # Case 1 and  2a
-            if not self.kwargs['are_var_coords'] or self.both_coords_1d():
-                series_sel = {
-                    self.kwargs['x']: self.correct_val(self.kwargs['x'], x),
-                    self.kwargs['y']: self.correct_val(self.kwargs['y'], y)}
-            # Case 2b
-            elif self.both_coords_2d_with_same_dims():
-                y_dim, x_dim = self.data[self.kwargs['x']].dims
-
-                y_mean = self.data[self.kwargs['y']].mean() * np.pi / 180.
-                a = (self.data[self.kwargs['y']] - y) ** 2 + (
-                            (self.data[self.kwargs['x']] - x) * np.cos(
-                        y_mean)) ** 2
-                j, i = np.unravel_index(a.argmin(), a.shape)
-
-                series_sel = {x_dim: self.correct_val(x_dim, i),
-                              y_dim: self.correct_val(y_dim, j)}
-            # Case 2c
-            else:
-                logger.debug("Cannot extract 2d coords with different dims and"
-                             " multi-dimensional coords.")
-                return self.series
-
-            if len(other_dims):
-                series_sel.update(other_dim_sels)
+            self._plot_series([(x, y, color)])
+        else:
+            with self._series_lock:
+                self._overlay_series()
+        return self.series
 
-            sel_series_data = self.data[self.var]
-            for dim, val in series_sel.items():
-                sel_series_data = sel_val_from_dim(sel_series_data, dim, val)
+    def select_region(self, bounds=None, geometry=None):
+        """
+        Plot the series of the statistics over a region selected with the
+        box select or the lasso select tool.
 
-            series_df = pd.DataFrame({extract_along: self.data[extract_along],
-                                      self.var: np.asarray(sel_series_data)})
+        The mean is drawn as a dashed line, between faint lines at the
+        minimum and the maximum, in the same figure as the series at the
+        taps. The statistics are computed on a worker thread, see
+        ``extract_region``.
+        """
+        if geometry is not None and len(geometry) < 3:
+            geometry = None
+        if (bounds is None and geometry is None) or \
+                self.clear_series_button.disabled or \
+                not self.kwargs['extract along']:
+            return
+        region = (bounds, geometry, next(iter(self.color_pool)))
+        self.regions.append(region)
+        self._plot_regions([region])
+
+    def redraw_series(self):
+        """
+        Extract and plot the series at all the stored taps and regions,
+        e.g. after plotting another variable.
 
-            tooltips = [(extract_along, f"@{extract_along}"),
-                        (self.var, f"@{self.var}")]
-            if len(other_dims):
-                for dim, val in other_dim_sels.items():
-                    tooltips.append((dim, str(val)))
-            hover = HoverTool(tooltips=tooltips)
+        All the series at taps are read at once, see ``extract_series``.
+        """
+        self._reset_series()
+        if self.taps and self.kwargs['extract along']:
+            self._plot_series(list(self.taps))
+        if self.regions and self.kwargs['extract along']:
+            self._plot_regions(list(self.regions))
+        return self.series
 
-            series_map = series_df.hvplot(x=extract_along, y=self.var,
-                                          frame_height=self.kwargs['frame_height'],
-                                          frame_width=self.kwargs['frame_width'],
-                                          tools=[hover])
-            self.series = series_map.opts(color=color) * self.series
+    def wait_for_series(self):
+        """
+        Block until the series being extracted have been plotted.
 
-        return self.series
+        Without an event loop, e.g. in a script, series are swapped in on
+        this call, or on the next tap, rather than on the worker thread.
+        """
+        # the pool has a single thread, so the series submitted before this
+        # are done once it returns
+        self._series_pool.submit(lambda: None).result()
+        self._swap_series()
+
+    def _reset_series(self):
+        # The series are overlaid in a single NdOverlay, keyed by tap, which
+        # a DynamicMap redraws when a series is added or swapped in. The
+        # curves which did not change are the same objects, so only the
+        # data of new curves is sent to the browser.
+        with self._series_lock:
+            self._series_generation += 1
+            self._series_maps = []
+            self._series_base = self._series_curve([]).opts(
+                frame_height=self.kwargs['frame_height'],
+                frame_width=self.kwargs['frame_width'])
+            self._series_views = {}
+            self._series_stream = streams.Stream.define(
+                'Series', version=0)()
+            self._series_range = streams.RangeX()
+            self.series = hv.DynamicMap(self._series_overlay,
+                                        streams=[self._series_stream,
+                                                 self._series_range])
+
+    def _series_overlay(self, version, x_range=None):
+        curves = [self._series_base] + [
+            self._series_view(i, curve, x_range)
+            for i, curve in enumerate(self._series_maps)]
+        # not batched, so that each curve has its own data source
+        return hv.NdOverlay(dict(enumerate(curves)), kdims='tap').opts(
+            show_legend=False, batched=False)
+
+    def _series_view(self, i, curve, x_range):
+        # The part of `curve` in `x_range`, downsampled to a few points per
+        # pixel of the frame. Views are kept until the curve or the range
+        # change, so that unchanged curves are not sent again.
+        view = self._series_views.get(i)
+        if view is not None and view[0] is curve and view[1] == x_range:
+            return view[2]
+        extract_along = self.kwargs['extract along']
+        start, stop = 0, len(curve)
+        # the range of a plot drawn before any series is NaN
+        if x_range is not None and not pd.isnull(list(x_range)).any() \
+                and len(curve):
+            start, stop = sorted(self.coord_lookup.positions(extract_along,
+                                                             x_range))
+            # one more point on each side, so the line reaches the edges
+            start, stop = max(start - 1, 0), min(stop + 2, len(curve))
+        positions = start + minmax_indices(
+            curve.dimension_values(1)[start:stop], self.kwargs['frame_width'])
+        shown = curve if len(positions) == len(curve) else curve.iloc[positions]
+        self._series_views[i] = (curve, x_range, shown)
+        return shown
+
+    def _overlay_series(self):
+        if getattr(self.series_graph[0], 'object', None) is not self.series:
+            self.series_graph[0] = self.series
+        # the zoomed range is kept, so new series are shown in it at full
+        # resolution too
+        self._series_stream.event(version=self._series_stream.version + 1)
+
+    def _series_curve(self, data):
+        return hv.Curve(data, self.kwargs['extract along'] or 'x', self.var)
+
+    def _plot_series(self, taps):
+        state = self._series_state()
+        self._plot_async(
+            [self._series_curve([]).opts(color=color) for _, _, color in taps],
+            partial(self._extract_series, [(x, y) for x, y, _ in taps], state),
+            lambda series: [self._series_map(series[i], color, state)
+                            for i, (_, _, color) in enumerate(taps)])
+
+    def _plot_regions(self, regions):
+        state = self._series_state()
+        placeholders = [self._series_curve([]).opts(color=color)
+                        for _, _, color in regions for _ in range(3)]
+
+        def extract():
+            return [self._extract_region(bounds, geometry, state)
+                    for bounds, geometry, _ in regions]
+
+        def to_maps(all_stats):
+            maps = []
+            for stats, (_, _, color) in zip(all_stats, regions):
+                maps += self._region_maps(stats, color, state)
+            return maps
+
+        self._plot_async(placeholders, extract, to_maps)
+
+    def _plot_async(self, placeholders, extract, to_maps):
+        # Plots the ``placeholders``, then calls ``extract`` on a worker
+        # thread, and swaps in the plots made by ``to_maps`` from its
+        # result, one for each placeholder, once they are read
+        self._swap_series()
+        with self._series_lock:
+            generation = self._series_generation
+            start = len(self._series_maps)
+            self._series_maps.extend(placeholders)
+            self._overlay_series()
+        doc = pn.state.curdoc
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        future = self._series_pool.submit(extract)
+
+        def swap():
+            try:
+                maps = to_maps(future.result())
+            except Exception:
+                logger.exception("Unable to extract the series.")
+                return
+            with self._series_lock:
+                if generation != self._series_generation:
+                    return  # the series were cleared, or plotted again
+                self._series_maps[start:start + len(maps)] = maps
+                self._overlay_series()
+
+        def done(future):
+            # models are updated on the thread which asked for the series:
+            # from the event loop of the server, or of the notebook, or
+            # else once the series are waited for, or asked for again
+            if doc is not None and doc.session_context:
+                doc.add_next_tick_callback(swap)
+            elif loop is not None:
+                loop.call_soon_threadsafe(swap)
+            else:
+                self._series_swaps.put(swap)
+
+        future.add_done_callback(done)
+
+    def _swap_series(self):
+        # Swaps in the series read since the last call, when there is no
+        # event loop to do it
+        while True:
+            try:
+                swap = self._series_swaps.get_nowait()
+            except queue.Empty:
+                return
+            swap()
+
+    def _series_state(self):
+        # What the series are extracted from, taken on the calling thread,
+        # so that series read on the worker thread after a re-plot or a
+        # change of selector still match their keys in `series_cache`
+        x, y = self.data[self.kwargs['x']], self.data[self.kwargs['y']]
+        aggs, plan = self._aggregation_plan()
+        sels = self._other_dim_sels()
+        return {'data': self.data, 'lookup': self.coord_lookup,
+                'var': self.var, 'extract_along': self.kwargs['extract along'],
+                'x': self.kwargs['x'], 'y': self.kwargs['y'],
+                'are_var_coords': self.kwargs['are_var_coords'],
+                'aggs': aggs, 'plan': plan, 'sels': sels,
+                'fixed': {dim: int(self.coord_lookup.positions(dim, [val])[0])
+                          for dim, val in sels.items()
+                          if dim not in x.dims + y.dims},
+                'agg_key': self._aggregation_task({})[0],
+                'projected': self._projected, 'mesh': self.projected_mesh()}
+
+    def extract_series(self, points):
+        """
+        Extract the series at many tapped ``(x, y)`` points.
+
+        The points are in the projection of the graph if it is geographic,
+        and are transformed back to the crs of the data.
+
+        The points are resolved to positions along the dims of the variable
+        in one vectorized step, and all the series are read with a single
+        pointwise ``isel``, so that dask-backed data is read in one go.
+        The other dims are selected with the index selectors, and the
+        aggregations of the graph are applied, so that the series match
+        it. The whole aggregated variable is reused if it is in
+        ``agg_cache``, otherwise only the tapped columns are reduced.
+
+        Series are kept in ``series_cache``, keyed by the variable, the
+        extract-along dim, the aggregations and the positions selected
+        along the other dims, so that only series which were not extracted
+        before are read.
+
+        Returns
+        -------
+        A ``xarray.DataArray`` with the dims ``('point', extract_along)``.
+        """
+        return self._extract_series(points, self._series_state())
+
+    def _extract_series(self, points, state):
+        data, lookup = state['data'], state['lookup']
+        extract_along = state['extract_along']
+        xs, ys = (np.asarray(values) for values in zip(*points))
+        if state['projected'] is not None:
+            # taps are in the projection of the graph
+            crs, projection = state['projected'][:2]
+            xs, ys = transform_points(xs, ys, projection, crs)
+
+        x, y = data[state['x']], data[state['y']]
+        # Case 1 and  2a
+        if not state['are_var_coords'] or (x.ndim == 1 and y.ndim == 1):
+            positions = {}
+            for coord, values in [(state['x'], xs), (state['y'], ys)]:
+                dim = data[coord].dims[0]
+                positions[dim] = lookup.positions(coord, values)
+        # Case 2b and 2c
+        else:
+            positions = self._nearest_cell(data, (state['x'], state['y']),
+                                           xs, ys)
+
+        positions = {dim: np.asarray(pos) for dim, pos in positions.items()
+                     if dim != extract_along}
+        fixed = state['fixed']
+        keys = [(state['var'], extract_along, state['aggs'],
+                 tuple(sorted(fixed.items())),
+                 tuple((dim, int(pos[i])) for dim, pos in
+                       sorted(positions.items())))
+                for i in range(len(xs))]
+
+        series = {key: self.series_cache.get(key) for key in keys}
+        missing = [i for i, key in enumerate(keys) if series[key] is None]
+        if missing:
+            indexers = {dim: xr.DataArray(pos[missing], dims='point')
+                        for dim, pos in positions.items()}
+            read = self._aggregated_columns(state, {**indexers, **fixed})
+            read = read.transpose('point', extract_along).load()
+            for j, i in enumerate(missing):
+                series[keys[i]] = self.series_cache[keys[i]] = read[j].copy()
+        return xr.concat([series[key] for key in keys], dim='point')
+
+    def _aggregated_columns(self, state, indexers):
+        # The variable at `indexers`, reduced with the plan of `state`:
+        # taken from the whole aggregated variable if it was computed for
+        # the graph, or else read and reduced at `indexers` only
+        variable = state['data'][state['var']]
+        if not state['plan']:
+            return variable.isel(**indexers)
+        whole = self.agg_cache.get(state['agg_key'])
+        if whole is not None:
+            return whole.isel(**indexers)
+        return reduce_data(variable.isel(**indexers), state['plan'])
+
+    def extract_region(self, bounds=None, geometry=None):
+        """
+        Extract the series of the statistics over a region of the graph.
+
+        The region is either a box, ``bounds`` being ``(left, bottom, right,
+        top)``, or a polygon, ``geometry`` being its ``(n, 2)`` vertices, in
+        the coordinates of the plotted ``x`` and ``y``, or in the projection
+        of a geographic graph, see ``projected_mesh``. The other dims are
+        selected, and aggregated over the box around the region only, as
+        for ``extract_series``. If ``x`` or ``y`` is a latitude, the mean
+        and the standard deviation are weighted by the area of the cells,
+        i.e. by the cosine of the latitude.
+
+        The statistics are kept in ``series_cache`` too.
+
+        Returns
+        -------
+        A ``xarray.Dataset`` with ``mean``, ``min``, ``max`` and ``std``
+        along the extract-along dim, see ``region_stats``.
+        """
+        return self._extract_region(bounds, geometry, self._series_state())
+
+    def _extract_region(self, bounds, geometry, state):
+        extract_along = state['extract_along']
+        x, y = state['data'][state['x']], state['data'][state['y']]
+        fixed = state['fixed']
+        region = (tuple(bounds) if geometry is None else
+                  tuple(map(tuple, np.asarray(geometry).tolist())))
+        key = (state['var'], extract_along, state['aggs'],
+               tuple(sorted(fixed.items())),
+               (state['x'], state['y'],
+                state['projected'] and state['projected'][2]), region)
+        stats = self.series_cache.get(key)
+        if stats is None:
+            lat = x if is_latitude(x) else y if is_latitude(y) else None
+            if state['mesh'] is not None:
+                # regions are drawn in the projection of the graph
+                x, y = state['mesh']['x'], state['mesh']['y']
+            mask = region_mask(x, y, bounds, geometry)
+            weights = None if lat is None else np.cos(np.deg2rad(lat))
+            # coords along the extracted dim are taken at its first value
+            if extract_along in mask.dims:
+                mask = mask.isel({extract_along: 0})
+                if weights is not None:
+                    weights = weights.isel({extract_along: 0})
+            box = mask_box(mask)
+            if weights is not None:
+                weights = weights.isel({dim: box[dim] for dim in weights.dims})
+            data = self._aggregated_columns(state, {**fixed, **box})
+            stats = self.series_cache[key] = region_stats(
+                data, mask.isel(box), weights)
+        return stats
+
+    def _region_maps(self, stats, color, state):
+        # The mean, between faint lines at the minimum and the maximum. The
+        # overlay holds curves only, so the range is not drawn as an area.
+        extract_along, var = state['extract_along'], state['var']
+        along = state['data'][extract_along].values
+        hover = HoverTool(tooltips=[(extract_along, f"@{extract_along}"),
+                                    (var, f"@{var}"),
+                                    ('std', "@std")])
+        mean = hv.Curve((along, stats['mean'].values, stats['std'].values),
+                        extract_along, [var, 'std'])
+        return [mean.opts(color=color, line_dash='dashed', tools=[hover])] + [
+            hv.Curve((along, stats[name].values), extract_along, var).opts(
+                color=color, alpha=0.4, line_width=1)
+            for name in ['min', 'max']]
+
+    def _other_dim_sels(self):
+        # to use the value selected in index selector for selecting
+        # data to create series. Aggregated dims are reduced instead,
+        # see `_aggregated_columns`.
+        extract_along = self.kwargs['extract along']
+        other_dims = [dim for dim in self.kwargs['remaining_dims'] if
+                      dim != extract_along and
+                      dim not in self.kwargs['dims_to_agg']]
+        other_dim_sels = {}
+        for dim in other_dims:
+            dim_found = False
+            for dim_sel in self.index_selectors:
+                long_name = self.data[dim].long_name if hasattr(
+                    self.data[dim], 'long_name') else None
+                if dim_sel.name == dim or dim_sel.name == long_name:
+                    val = dim_sel.value
+                    other_dim_sels.update({dim: val})
+                    dim_found = True
+            if not dim_found:
+                val = self.data[dim][0].values
+                other_dim_sels.update({dim: val})
+        return other_dim_sels
+
+    def _series_map(self, series, color, state):
+        extract_along, var = state['extract_along'], state['var']
+        tooltips = [(extract_along, f"@{extract_along}"),
+                    (var, f"@{var}")]
+        for dim, val in state['sels'].items():
+            tooltips.append((dim, str(val)))
+        for dim, agg in state['aggs']:
+            tooltips.append((dim, agg))
+        hover = HoverTool(tooltips=tooltips)
+
+        # the coordinate is passed as is, without copying it to a DataFrame
+        curve = hv.Curve((state['data'][extract_along].values,
+                          np.asarray(series)), extract_along, var)
+        return curve.opts(color=color, tools=[hover])
 
     def create_selectors_players(self, graph):
         """
@@ -514,7 +1290,9 @@ class Dashboard(SigSlot):
                         selector = convert_widget(slider, pn.widgets.Select)
                     else:
                         selector = convert_widget(slider, pn.widgets.DiscretePlayer)
+                        selector.param.watch(self._prefetch_frames, 'value')
                     self.index_selectors.append(selector)
+                    self.selector_dims.append(dim)
 
         for selector in self.index_selectors:
             if isinstance(selector, pn.widgets.Select):
@@ -528,6 +1306,7 @@ class Dashboard(SigSlot):
             xr.Dataset({f'{data.name}': data})
             if isinstance(data, xr.DataArray) else data
         )
+        self.coord_lookup = CoordLookup(self.data)
 
     def set_coords(self, *args):
         # We can't reset indexed coordinates so add them every time
@@ -536,6 +1315,7 @@ class Dashboard(SigSlot):
         indexed_coords = set(self.data.dims).intersection(set(self.data.coords))
         new_coords = set(args[0]).union(indexed_coords)
         self.data = self.data.set_coords(new_coords)  # this `set_coords` belongs to xr.dataset
+        self.coord_lookup = CoordLookup(self.data)
         self.control.set_coords(self.data)
 
     def check_is_plottable(self, var):
@@ -548,42 +1328,54 @@ class Dashboard(SigSlot):
         data = self.data[var]
         self.plot_button.disabled = len(data.dims) <= 1
 
-    def correct_val(self, dim, x):
-        """ Convert tapped coordinates to int, if not time-type
+    def nearest_cell(self, x, y):
         """
-        dtype = self.data[dim].dtype.kind
-        if dtype == 'i':
-            return int(x)
-        elif dtype == 'f':
-            return float(x)
-        else:
-            return str(x)
+        Positions, along every dim of the multi-dimensional ``x`` and ``y``
+        coords, of the cell nearest to the tapped point ``(x, y)``.
+
+        If ``x`` or ``y`` is found to be a latitude, the cells are compared
+        on the sphere, see ``NearestCell``, or else in the plane.
+        The index over the cells is built on the first tap, and kept in
+        ``nearest_cells`` for the following ones.
+        """
+        return self._nearest_cell(self.data,
+                                  (self.kwargs['x'], self.kwargs['y']), x, y)
+
+    def _nearest_cell(self, data, coords, x, y):
+        if is_latitude(data[coords[0]]) and not is_latitude(data[coords[1]]):
+            coords, (x, y) = coords[::-1], (y, x)
+        index = self.nearest_cells.get(coords)
+        if index is None:
+            index = NearestCell(data[coords[0]], data[coords[1]])
+            self.nearest_cells[coords] = index
+        return index.query(x, y)
 
     def both_coords_1d(self):
         return len(self.data[self.kwargs['x']].dims) == 1 and len(self.data[self.kwargs['y']].dims) == 1
 
-    def both_coords_2d_with_same_dims(self):
-        x_dims = self.data[self.kwargs['x']].dims
-        y_dims = self.data[self.kwargs['y']].dims
-        return len(x_dims) == len(y_dims) == 2 and sorted(x_dims) == sorted(y_dims)
 
+def find_cmap_limits(sel_data, sample_size=100000, max_exact_size=1000000):
+    """
+    Find the 10th and 90th percentiles of ``sel_data``, used as the initial
+    colormap limits.
 
-def find_cmap_limits(sel_data):
-    if isinstance(sel_data.data, dask.array.core.Array):
-        method = 'tdigest' if has_crick_tdigest else 'default'
-        return dask.array.percentile(sel_data.data.ravel(), (10, 90),
-                                     method=method).compute()
-    else:  # if sel_data.data is numpy.ndarray
-        return [float(q) for q in sel_data.quantile([0.1, 0.9])]
+    See ``quantile_sketch`` for the meaning of the keyword arguments.
+    """
+    sketch = quantile_sketch(sel_data, sample_size=sample_size,
+                             max_exact_size=max_exact_size)
+    return list(sketch[1:3])
 
 
-def sel_val_from_dim(data, dim, x):
-    """ Select values from a dim.
+def describe_limits_error(error):
+    """
+    Describe the bound on the error of the cmap limits, as returned by
+    ``quantile_sketch``, for display next to them.
     """
-    try:
-        return data.sel({dim: x})
-    except:
-        return data.sel({dim: x}, method='nearest')
+    if error is None:
+        return 'estimated by dask'
+    if error == 0:
+        return 'exact'
+    return f'\u00b1{error:.2%} in rank'
 
 
 def process_proj_params(params):
@@ -593,3 +1385,15 @@ def process_proj_params(params):
             globe = ccrs.Globe(**v)
             params.update({'globe': globe})
     return params
+
+
+def _compute_aggregation(data, plan, is_slice=False, max_bytes=None):
+    data = reduce_data(data, plan)
+    if isinstance(data.data, dask.array.Array):
+        if is_slice:
+            data = data.compute()
+        elif max_bytes is None or data.nbytes <= max_bytes:
+            # the size is known before computing, so results which the
+            # cache cannot hold are left lazy, to be read frame by frame
+            data = data.persist()
+    return data
@@ -0,0 +1,38 @@
+import numpy as np
+
+
+def minmax_indices(values, n_buckets):
+    """
+    Positions of the points to keep to draw ``values`` as a line which is
+    ``n_buckets`` pixels wide.
+
+    ``values`` is split into ``n_buckets`` buckets of consecutive points,
+    and the minimum and the maximum of each bucket are kept, along with the
+    first and last points. The line drawn through them looks the same as
+    the full line at that width, peaks included. A bucket which is all NaN
+    keeps one NaN, so that gaps are still drawn as gaps.
+
+    Parameters
+    ----------
+    values: 1-D numpy array
+    n_buckets: int
+
+    Returns
+    -------
+    A sorted array of positions, all of them if ``values`` has no more than
+    ``2 * n_buckets`` points.
+    """
+    n = len(values)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = values
+    buckets = padded.reshape(n_buckets, size)
+    nan = np.isnan(buckets)
+    lowest = np.where(nan, np.inf, buckets).argmin(axis=1)
+    highest = np.where(nan, -np.inf, buckets).argmax(axis=1)
+    start = np.arange(n_buckets) * size
+    keep = np.concatenate([[0, n - 1], start + lowest, start + highest])
+    return np.unique(keep[keep < n])
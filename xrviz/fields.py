@@ -46,6 +46,11 @@ class Fields(SigSlot):
             7. ``std``: Creates plot along standard deviation of the selected dimension.
             8. ``count``: Creates plot along non-nan values of the selected dimension.
 
+        When several dimensions are aggregated, the aggregations are
+        applied in the order of their selectors, and neighbouring ones
+        sharing an aggregation are reduced together (e.g. ``mean`` over both
+        ``time`` and ``member`` is the mean over all their values).
+
         Note that for both ``select`` and ``animate``, the plot will update
         according to the value selected in the generated widget. Also, if a
         dimension has been aggregated, its select widget would not be
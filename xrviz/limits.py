@@ -0,0 +1,128 @@
+import inspect
+import dask
+import dask.array
+import numpy as np
+import pandas as pd
+import xarray as xr
+from .compatibility import has_crick_tdigest
+
+
+def approx_quantiles(values, q, sample_size=100000, confidence=0.99, seed=0):
+    """
+    Estimate quantiles of ``values`` from a random sample.
+
+    The sample is drawn (with replacement) by position, without copying or
+    sorting ``values``; NaNs are ignored.
+
+    Parameters
+    ----------
+    values: numpy.ndarray
+    q: list of float
+        Quantiles to compute, between 0 and 1.
+    sample_size: int
+        Number of values to draw.
+    confidence: float
+        Probability with which the error bound holds.
+    seed: int
+        Seed of the random sample, so that plotting the same data twice
+        gives the same limits.
+
+    Returns
+    -------
+    ``(quantiles, error)``, where, by the Dvoretzky–Kiefer–Wolfowitz
+    inequality, the rank of each of the quantiles within ``values`` is
+    within ``q ± error`` with probability ``confidence``.
+    """
+    values = np.asarray(values)
+    idx = np.random.RandomState(seed).randint(0, values.size, sample_size)
+    sample = values.flat[idx]
+    sample = sample[~pd.isnull(sample)]
+    if not sample.size:
+        return [np.nan] * len(q), 1.
+    error = np.sqrt(np.log(2 / (1 - confidence)) / (2 * sample.size))
+    return [float(v) for v in np.quantile(sample, q)], float(error)
+
+
+def quantile_sketch(sel_data, sample_size=100000, max_exact_size=1000000,
+                    return_error=False):
+    """
+    Summarise the distribution of ``sel_data`` for colormap limits.
+
+    Returns ``(min, q10, q90, max)``, the 10th and 90th percentiles being
+    the default colormap limits. Keeping the extremes allows to tell
+    whether a color scale is monotonic over the data, see ``scale_limits``.
+
+    In-memory arrays of more than ``max_exact_size`` values use quantiles
+    of a random sample of ``sample_size`` values, see ``approx_quantiles``,
+    as the limits only seed the colorbar. For dask arrays, the percentiles
+    and extremes are computed together, in a single pass over the data.
+
+    If ``return_error``, ``(sketch, error)`` is returned, ``error`` being
+    the bound on the error in rank of the quantiles of a sample, ``0`` for
+    exact quantiles, or ``None`` for the approximate ones of dask, which
+    have no such bound.
+    """
+    if isinstance(sel_data, xr.Dataset):
+        sel_data = sel_data[list(sel_data.data_vars)[0]]
+    if isinstance(sel_data.data, dask.array.Array):
+        values = sel_data.data.ravel()
+        (lower, upper), vmin, vmax = dask.compute(
+            _dask_percentile(values, (10, 90)),
+            dask.array.nanmin(values), dask.array.nanmax(values))
+        error = None
+    elif sel_data.size > max_exact_size:
+        values = sel_data.values
+        (lower, upper), error = approx_quantiles(values, [0.1, 0.9],
+                                                 sample_size=sample_size)
+        vmin, vmax = np.nanmin(values), np.nanmax(values)
+    else:
+        lower, upper = sel_data.quantile([0.1, 0.9]).values
+        vmin, vmax = sel_data.min().values, sel_data.max().values
+        error = 0.
+    sketch = tuple(float(v) for v in (vmin, lower, upper, vmax))
+    return (sketch, error) if return_error else sketch
+
+
+def _dask_percentile(values, q):
+    method = 'tdigest' if has_crick_tdigest else 'default'
+    # dask>=2022.1 renamed `method` to `internal_method`
+    if 'internal_method' in inspect.signature(dask.array.percentile).parameters:
+        return dask.array.percentile(values, q, internal_method=method)
+    return dask.array.percentile(values, q, method=method)
+
+
+def scale_limits(sketch, color_scale):
+    """
+    Derive colormap limits for color-scaled data from the ``quantile_sketch``
+    of the unscaled data.
+
+    Quantiles commute with monotonic functions, so for a scaling which is
+    increasing over the range of the data the limits are the scaled
+    quantiles, and for a decreasing one (e.g. ``reciprocal`` of positive
+    data) they are also swapped.
+
+    Returns ``(lower, upper)``, or ``None`` if the scaling is not monotonic
+    and finite over the range of the data, in which case the limits have to
+    be computed from the scaled data.
+    """
+    vmin, lower, upper, vmax = sketch
+    if color_scale == 'linear':
+        return lower, upper
+    monotonic = {
+        'exp': True,
+        'log': vmin > 0,
+        'sqrt': vmin >= 0,
+        'reciprocal': vmin > 0 or vmax < 0,
+        'square': vmin >= 0 or vmax <= 0,
+    }
+    if not monotonic.get(color_scale, False):
+        return None
+    decreasing = color_scale == 'reciprocal' or (
+        color_scale == 'square' and vmax <= 0)
+    if decreasing:
+        lower, upper = upper, lower
+    with np.errstate(all='ignore'):
+        limits = getattr(np, color_scale)(np.array([lower, upper], dtype=float))
+    if not np.isfinite(limits).all():
+        return None
+    return float(limits[0]), float(limits[1])
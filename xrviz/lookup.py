@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+
+class CoordLookup(object):
+    """
+    Resolve coordinate values to positions, to be used with ``isel``.
+
+    The ``pandas.Index`` of each 1-D coordinate is built on first use and
+    kept, so that each lookup is a single vectorized search.
+
+    Parameters
+    ----------
+    data: xarray.Dataset
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.indexes = {}
+
+    def index(self, name):
+        index = self.indexes.get(name)
+        if index is None:
+            index = self.indexes[name] = self.data[name].to_index()
+        return index
+
+    def positions(self, name, values):
+        """
+        Positions, along the dim of the 1-D coordinate ``name``, of the
+        labels nearest to ``values``.
+        """
+        return nearest_positions(self.index(name), values)
+
+
+def nearest_positions(index, values):
+    """
+    Positions of the labels of ``index`` nearest to ``values``.
+
+    Numeric, ``datetime64`` and cftime labels are supported, sorted or
+    not. An exact match is its own nearest label, so no exact lookup is
+    tried first, and no exception is raised for values between labels.
+    Other labels, e.g. names, have no nearest one, and are matched
+    exactly: a ``KeyError`` is raised for values which are not labels.
+
+    Parameters
+    ----------
+    index: pandas.Index
+    values: array-like
+        Converted to the type of the labels with ``coerce_values``.
+    """
+    values = coerce_values(index, values)
+    if index.dtype.kind not in 'iufmM' and \
+            not isinstance(index, xr.CFTimeIndex):
+        positions = index.get_indexer(values)
+        if (positions < 0).any():
+            raise KeyError(values[positions < 0].tolist())
+        return positions
+    if index.is_monotonic_increasing:
+        return _nearest_sorted(index, values)
+    if index.is_monotonic_decreasing:
+        return len(index) - 1 - _nearest_sorted(index[::-1], values)
+    order = np.argsort(np.asarray(index))
+    return order[_nearest_sorted(index[order], values)]
+
+
+def coerce_values(index, values):
+    """
+    Convert ``values`` to the type of the labels of ``index``.
+
+    Values for a ``datetime64`` index may be strings, datetimes or, as
+    given by taps on a datetime axis, numbers of milliseconds since the
+    epoch. Values for a cftime index must be cftime dates.
+    """
+    values = np.atleast_1d(np.asarray(values))
+    if isinstance(index, pd.DatetimeIndex):
+        if values.dtype.kind in 'iuf':
+            return pd.to_datetime(values, unit='ms').values
+        return pd.to_datetime(values).values
+    if isinstance(index, xr.CFTimeIndex):
+        return values.astype(object)
+    return values
+
+
+def _nearest_sorted(index, values):
+    if len(index) == 1:
+        return np.zeros(len(values), dtype=int)
+    right = np.clip(index.searchsorted(values), 1, len(index) - 1)
+    left = right - 1
+    labels = np.asarray(index)
+    closer_left = (values - labels[left]) <= (labels[right] - values)
+    return np.where(np.asarray(closer_left, dtype=bool), left, right)
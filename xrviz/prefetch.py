@@ -0,0 +1,212 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+from functools import partial
+import dask.array
+import numpy as np
+from .cache import LRUCache
+
+
+def upcoming(index, size, step=1, count=4, loop=False):
+    """
+    Positions of the next ``count`` frames of a player.
+
+    Parameters
+    ----------
+    index: int
+        Position of the frame being displayed.
+    size: int
+        Number of frames.
+    step: int
+        ``1`` when playing forward, ``-1`` when playing in reverse.
+    loop: bool
+        Whether the player wraps around at the ends.
+    """
+    out = []
+    for i in range(1, count + 1):
+        pos = index + i * step
+        if loop:
+            pos %= size
+        elif not 0 <= pos < size:
+            break
+        out.append(pos)
+    return out
+
+
+class FramePrefetcher(object):
+    """
+    Compute frames ahead of an animation in a pool of threads.
+
+    Frames are identified by hashable keys, and computed by calling the
+    function given along with the key. Computed frames are kept in a
+    bounded ``LRUCache``.
+
+    Parameters
+    ----------
+    cache: LRUCache
+        Where computed frames are kept. A new cache of 256 MiB is created
+        if not given.
+    ahead: int
+        Maximum number of frames computed in advance.
+    max_workers: int
+        Number of threads computing frames.
+    """
+
+    def __init__(self, cache=None, ahead=4, max_workers=2):
+        self.cache = LRUCache(max_bytes=2**28) if cache is None else cache
+        self.ahead = ahead
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """
+        Return the frame for ``key``.
+
+        The frame is taken from the cache, or from its pending computation
+        if it is being prefetched, or else computed right away.
+        """
+        frame = self.cache.get(key)
+        if frame is not None:
+            return frame
+        with self._lock:
+            future = self._pending.get(key)
+            # the frame may have been computed since the first look
+            frame = self.cache.get(key)
+        if frame is not None:
+            return frame
+        if future is not None:
+            try:
+                return future.result()
+            except CancelledError:
+                pass
+        frame = compute()
+        self.cache[key] = frame
+        return frame
+
+    def prefetch(self, tasks):
+        """
+        Compute frames in the background.
+
+        ``tasks`` is a list of ``(key, compute)`` pairs, ordered by how soon
+        the frames will be needed. Queued work for frames which are not in
+        ``tasks`` is dropped, e.g. after the user jumped elsewhere.
+        """
+        tasks = tasks[:self.ahead]
+        keys = {key for key, _ in tasks}
+        with self._lock:
+            for key, future in list(self._pending.items()):
+                if key not in keys and future.cancel():
+                    del self._pending[key]
+            for key, compute in tasks:
+                if key in self._pending or key in self.cache:
+                    continue
+                self._pending[key] = self._pool.submit(self._run, key, compute)
+
+    def cancel(self):
+        """
+        Drop all queued work.
+        """
+        self.prefetch([])
+
+    @property
+    def pending(self):
+        with self._lock:
+            return list(self._pending)
+
+    def _run(self, key, compute):
+        try:
+            frame = compute()
+            self.cache[key] = frame
+            return frame
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+
+class PrefetchedFrames(object):
+    """
+    Serve the frames of dask-backed ``data`` through a ``FramePrefetcher``.
+
+    ``to_xarray`` gives a copy of ``data`` which reads each frame (one
+    value along each of ``dims``) from the prefetcher, so frames computed
+    ahead are used when they are displayed, whichever code selects them.
+
+    Parameters
+    ----------
+    data: xarray.DataArray
+    dims: list of str
+        The dims iterated over by the players.
+    prefetcher: FramePrefetcher
+    """
+
+    def __init__(self, data, dims, prefetcher):
+        self.data = data
+        self.dims = list(dims)
+        self.prefetcher = prefetcher
+        self.axes = [data.get_axis_num(dim) for dim in self.dims]
+        self.shape = data.shape
+        self.ndim = data.ndim
+        self.dtype = data.dtype
+        self.token = data.data.name
+
+    def task(self, selection):
+        """
+        The ``(key, compute)`` pair of the frame at ``selection``, a
+        ``{dim: value}`` mapping of coordinate values.
+        """
+        positions = tuple(self.data.get_index(dim).get_loc(selection[dim])
+                          for dim in self.dims)
+        return self._task(positions)
+
+    def store(self, selection, frame):
+        """
+        Keep ``frame``, already computed elsewhere, as the frame at
+        ``selection``, a ``{dim: position}`` mapping.
+        """
+        positions = tuple(selection[dim] for dim in self.dims)
+        self.prefetcher.cache[self._task(positions)[0]] = frame
+
+    def _task(self, positions):
+        return ((self.token, positions),
+                partial(self._load, positions))
+
+    def _load(self, positions):
+        return np.asarray(self.data.isel(dict(zip(self.dims, positions))))
+
+    def __getitem__(self, key):
+        key = key if isinstance(key, tuple) else (key,)
+        key = key + (slice(None),) * (self.ndim - len(key))
+        positions = []
+        for axis in self.axes:
+            k = key[axis]
+            if isinstance(k, slice):
+                k = range(*k.indices(self.shape[axis]))
+                if len(k) != 1:
+                    break
+                k = k[0]
+            elif not isinstance(k, (int, np.integer)):
+                break
+            positions.append(int(k) % self.shape[axis])
+        if (len(positions) < len(self.axes) or
+                not all(isinstance(k, (slice, int, np.integer)) for k in key)):
+            # not a single frame, read it directly
+            return np.asarray(self.data[key])
+
+        frame = self.prefetcher.get(*self._task(tuple(positions)))
+        out = frame[tuple(k for axis, k in enumerate(key)
+                          if axis not in self.axes)]
+        # restore the frame axes which were selected with a slice
+        for axis in self.axes:
+            if isinstance(key[axis], slice):
+                position = sum(isinstance(k, slice) for k in key[:axis])
+                out = np.expand_dims(out, position)
+        return out
+
+    def to_xarray(self):
+        chunks = tuple(1 if axis in self.axes else size
+                       for axis, size in enumerate(self.shape))
+        # giving meta avoids reading an empty slice to infer it
+        meta = np.empty((0,) * self.ndim, dtype=self.dtype)
+        arr = dask.array.from_array(self, chunks=chunks, meta=meta,
+                                    name=f'prefetched-{self.token}')
+        return self.data.copy(data=arr)
@@ -0,0 +1,90 @@
+import numpy as np
+from .utils import is_regular
+
+
+def coarsen_mean(data, dims, factor=2):
+    """
+    Block means of ``data`` over ``factor`` cells along each of ``dims``.
+
+    NaNs are skipped, so a block is NaN only if all its cells are. The
+    edges are padded, so no cell is dropped. Evenly spaced 1-D
+    coordinates are given the labels at the centers of the blocks, so
+    that they stay evenly spaced and can still be plotted as an image.
+    Other coordinates are averaged over the blocks.
+
+    Parameters
+    ----------
+    data: xarray.DataArray or xarray.Dataset
+    dims: list of str
+    factor: int
+    """
+    windows = {dim: factor for dim in dims if data.sizes[dim] > 1}
+    coarse = data.coarsen(windows, boundary='pad').mean(keep_attrs=True)
+    for name, coord in data.coords.items():
+        dim = coord.dims[0] if coord.ndim == 1 else None
+        if dim in windows and coord.dtype.kind in 'iuf' and \
+                is_regular(coord.values):
+            values = coord.values
+            step = (values[-1] - values[0]) / (len(values) - 1)
+            centers = np.arange(coarse.sizes[dim]) * factor + (factor - 1) / 2
+            coarse = coarse.assign_coords(
+                {name: (dim, values[0] + centers * step, coord.attrs)})
+    return coarse
+
+
+def pyramid_factor(sizes, pixels):
+    """
+    The coarsening factor, a power of two, of the coarsest level of a
+    pyramid which still has at least ``pixels`` cells along each dim.
+
+    Parameters
+    ----------
+    sizes: list of int
+        The number of cells in view along each dim.
+    pixels: int
+        The resolution of the screen, in pixels.
+
+    Returns
+    -------
+    ``1`` if the data is to be used at its own resolution.
+    """
+    factor = 1
+    while all(size // (factor * 2) >= pixels for size in sizes):
+        factor *= 2
+    return factor
+
+
+class Pyramid(object):
+    """
+    Coarsened levels of frames, ``2``, ``4``, ``8``... times coarser along
+    the plotted dims, made with ``coarsen_mean``.
+
+    Levels are built on first use, each one from the next finer one, at
+    a quarter of the cost of that one. They are kept in ``cache``, so that
+    a frame at full extent is rasterized from about the resolution of the
+    screen, and read only once.
+
+    Parameters
+    ----------
+    cache: LRUCache
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def level(self, frame, key, dims, factor):
+        """
+        The level of ``frame`` coarsened ``factor`` times along ``dims``,
+        loaded in memory.
+
+        ``key`` identifies the frame: levels of the frames with the same
+        ``key`` are shared.
+        """
+        if factor == 1:
+            return frame
+        level = self.cache.get(key + (factor,))
+        if level is None:
+            finer = self.level(frame, key, dims, factor // 2)
+            level = self.cache[key + (factor,)] = coarsen_mean(
+                finer, dims).load()
+        return level
@@ -0,0 +1,79 @@
+import os
+import dask
+import datashader
+import numpy as np
+
+
+def mesh_partitions(data, x, y, n_parts=None):
+    """
+    Chunk a curvilinear mesh into bands of rows, which datashader
+    rasterizes in parallel.
+
+    The data and its ``x`` and ``y`` coordinates are chunked the same way,
+    as datashader requires. Data which is already chunked along several
+    blocks keeps its chunks.
+
+    Parameters
+    ----------
+    data: xarray.DataArray
+        With 2-D ``x`` and ``y`` coordinates along its dims.
+    x, y: str
+        Names of the coordinates.
+    n_parts: int
+        The number of bands, by default the number of cores.
+
+    Returns
+    -------
+    A ``xarray.DataArray`` whose data and coordinates are dask arrays.
+    """
+    data = data.transpose(*data[x].dims)
+    if data.chunks is not None and np.prod([len(c) for c in data.chunks]) > 1:
+        chunks = dict(zip(data.dims, data.chunks))
+    else:
+        n_parts = n_parts or os.cpu_count() or 1
+        rows, cols = data.shape
+        chunks = {data.dims[0]: max(-(-rows // n_parts), 1),
+                  data.dims[1]: cols}
+    data = data.chunk(chunks)
+    return data.assign_coords({name: data[name].chunk(chunks)
+                               for name in (x, y)})
+
+
+def rasterize_mesh(data, x, y, width, height, x_range=None, y_range=None,
+                   n_parts=None):
+    """
+    Rasterize a curvilinear mesh with datashader, one band of rows per
+    thread, merging the partial canvases.
+
+    The mean of the cells falling in each pixel is taken, as by the
+    ``rasterize`` operation of HoloViews, which rasterizes the whole mesh
+    on a single thread.
+
+    Parameters
+    ----------
+    data: xarray.DataArray
+        With 2-D ``x`` and ``y`` coordinates along its dims.
+    x, y: str
+        Names of the coordinates.
+    width, height: int
+        Size of the canvas, in pixels.
+    x_range, y_range: tuple
+        Extent of the canvas, by default that of the coordinates.
+    n_parts: int
+        See ``mesh_partitions``.
+
+    Returns
+    -------
+    A ``xarray.DataArray`` of ``(height, width)`` pixels, along ``y`` and
+    ``x``.
+    """
+    if x_range is None:
+        x_range = (np.nanmin(data[x].values), np.nanmax(data[x].values))
+    if y_range is None:
+        y_range = (np.nanmin(data[y].values), np.nanmax(data[y].values))
+    canvas = datashader.Canvas(plot_width=int(width),
+                               plot_height=int(height),
+                               x_range=tuple(x_range), y_range=tuple(y_range))
+    mesh = mesh_partitions(data.astype(float), x, y, n_parts)
+    with dask.config.set(scheduler='threads'):
+        return canvas.quadmesh(mesh, x, y, datashader.mean(mesh.name))
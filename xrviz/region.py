@@ -0,0 +1,109 @@
+import dask
+import numpy as np
+import xarray as xr
+
+
+def region_mask(x, y, bounds=None, polygon=None):
+    """
+    Which cells of a grid are inside a box or a polygon.
+
+    Parameters
+    ----------
+    x, y: xarray.DataArray
+        Coordinates of the cells. They are broadcast against each other, so
+        they may be 1-D along different dims, or multi-dimensional.
+    bounds: tuple
+        ``(left, bottom, right, top)``, as given by a ``BoundsXY`` stream.
+    polygon: array-like
+        ``(n, 2)`` vertices of a polygon, as given by a ``Lasso`` stream.
+
+    Returns
+    -------
+    A boolean ``xarray.DataArray`` with the dims of the broadcast coords.
+    """
+    x, y = xr.broadcast(x, y)
+    y = y.transpose(*x.dims)
+    xs, ys = np.asarray(x), np.asarray(y)
+    if bounds is not None:
+        left, bottom, right, top = bounds
+        inside = ((xs >= min(left, right)) & (xs <= max(left, right)) &
+                  (ys >= min(bottom, top)) & (ys <= max(bottom, top)))
+    else:
+        inside = _inside_polygon(xs, ys, np.asarray(polygon, dtype=float))
+    return xr.DataArray(inside, dims=x.dims)
+
+
+def _inside_polygon(xs, ys, polygon):
+    # even-odd rule: count the edges crossed by a ray going right from
+    # each cell, one edge at a time for all cells at once
+    inside = np.zeros(xs.shape, dtype=bool)
+    x0, y0 = polygon[-1]
+    for x1, y1 in polygon:
+        if y0 != y1:
+            crosses = (y1 > ys) != (y0 > ys)
+            at_x = x1 + (ys - y1) * (x0 - x1) / (y0 - y1)
+            inside ^= crosses & (xs < at_x)
+        x0, y0 = x1, y1
+    return inside
+
+
+def mask_box(mask):
+    """
+    The smallest box holding all the cells of ``mask``, as ``isel``
+    slices, so that nothing outside the region needs to be read. If
+    ``mask`` is empty, this is a single cell, which is masked.
+    """
+    box = {}
+    for dim in mask.dims:
+        others = [other for other in mask.dims if other != dim]
+        positions = np.flatnonzero(mask.any(others).values)
+        if not len(positions):
+            return {dim: slice(0, 1) for dim in mask.dims}
+        box[dim] = slice(positions[0], positions[-1] + 1)
+    return box
+
+
+def region_stats(data, mask, weights=None):
+    """
+    Mean, minimum, maximum and standard deviation of ``data`` over the
+    cells of a region.
+
+    Only the box around the region is read, see ``mask_box``. The mask is
+    applied block by block, and all the statistics are computed together,
+    so that dask-backed data is read once. The mean and the standard
+    deviation are weighted by ``weights`` if given, e.g. by the cosine of
+    the latitude for the area of the cells of a lat/lon grid.
+
+    Parameters
+    ----------
+    data: xarray.DataArray
+    mask: xarray.DataArray
+        Boolean, along some of the dims of ``data``, as returned by
+        ``region_mask``.
+    weights: xarray.DataArray
+        Along some or all of the dims of ``mask``.
+
+    Returns
+    -------
+    A ``xarray.Dataset`` with ``mean``, ``min``, ``max`` and ``std``
+    variables, along the dims of ``data`` which are not in ``mask``. They
+    are NaN where the region holds no valid value.
+    """
+    box = mask_box(mask)
+    data, mask = data.isel(box), mask.isel(box)
+    if weights is not None:
+        weights = mask * weights.isel({dim: box[dim] for dim in weights.dims
+                                       if dim in box})
+    else:
+        weights = mask
+    dims = list(mask.dims)
+    inside = data.where(mask)
+    total = (weights * inside.notnull()).sum(dims)
+    mean = (inside * weights).sum(dims) / total
+    # deviations from the mean, rather than the mean of the squares minus
+    # the square of the mean, which loses the digits of values far from 0
+    variance = ((inside - mean) ** 2 * weights).sum(dims) / total
+    mean, variance, low, high = dask.compute(mean, variance, inside.min(dims),
+                                             inside.max(dims))
+    std = np.sqrt(variance)
+    return xr.Dataset({'mean': mean, 'min': low, 'max': high, 'std': std})
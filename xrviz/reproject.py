@@ -0,0 +1,82 @@
+import dask.base
+import numpy as np
+import xarray as xr
+from .compatibility import pyproj
+
+
+def mesh_fingerprint(x, y):
+    """
+    A token identifying the values of the ``x`` and ``y`` coordinates, so
+    that meshes projected from them are found again after the coordinates
+    are reset or the data is reloaded.
+    """
+    return dask.base.tokenize(x.dims, np.asarray(x), y.dims, np.asarray(y))
+
+
+def _to_pyproj(crs):
+    # cartopy CRSs are pyproj ones since cartopy 0.20, older ones hold
+    # their PROJ string
+    if isinstance(crs, pyproj.CRS):
+        return crs
+    return pyproj.CRS.from_user_input(getattr(crs, 'proj4_init', crs))
+
+
+def transform_points(xs, ys, source, target):
+    """
+    Transform the points ``(xs, ys)`` from the ``source`` to the ``target``
+    coordinate reference system, all at once.
+
+    A ``pyproj.Transformer`` is used if pyproj is installed, otherwise the
+    ``transform_points`` method of cartopy. Points outside of the domain
+    of ``target`` are NaN.
+
+    Parameters
+    ----------
+    xs, ys: array-like
+        Of the same shape, in the units of ``source``, e.g. longitudes and
+        latitudes in degrees for ``PlateCarree``.
+    source, target: cartopy.crs.CRS
+        Anything ``pyproj.CRS.from_user_input`` accepts, too, if pyproj is
+        installed.
+
+    Returns
+    -------
+    The ``(xs, ys)`` arrays of the transformed points.
+    """
+    xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+    if pyproj is not None:
+        transformer = pyproj.Transformer.from_crs(
+            _to_pyproj(source), _to_pyproj(target), always_xy=True)
+        xs, ys = transformer.transform(xs, ys)
+    else:
+        points = target.transform_points(source, xs, ys)
+        xs, ys = points[..., 0], points[..., 1]
+    xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+    invalid = ~(np.isfinite(xs) & np.isfinite(ys))
+    xs[invalid] = ys[invalid] = np.nan
+    return xs, ys
+
+
+def project_mesh(x, y, crs, projection):
+    """
+    The mesh of the cells of a grid, projected from ``crs`` to
+    ``projection``.
+
+    Parameters
+    ----------
+    x, y: xarray.DataArray
+        The coordinates of the cells, which are broadcast against each
+        other, so they may be 1-D along different dims, or
+        multi-dimensional.
+    crs, projection: cartopy.crs.CRS
+        See ``transform_points``.
+
+    Returns
+    -------
+    A ``xarray.Dataset`` with the projected ``x`` and ``y``, along the dims
+    of the broadcast coordinates.
+    """
+    x, y = xr.broadcast(x, y)
+    y = y.transpose(*x.dims)
+    xs, ys = transform_points(x.values, y.values, crs, projection)
+    return xr.Dataset({'x': (x.dims, xs), 'y': (x.dims, ys)})
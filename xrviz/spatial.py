@@ -0,0 +1,96 @@
+import numpy as np
+import xarray as xr
+from .compatibility import cKDTree
+
+
+def unit_vectors(lon, lat):
+    """
+    Points on the unit sphere, for longitudes and latitudes in degrees.
+
+    Euclidean distances between these vectors grow monotonically with
+    great-circle distances, so nearest neighbours found with them are
+    correct across the antimeridian and near the poles.
+    """
+    lon, lat = np.deg2rad(lon), np.deg2rad(lat)
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon),
+                     np.sin(lat)], axis=-1)
+
+
+def is_latitude(coord):
+    """
+    Whether ``coord`` holds latitudes, going by its CF attributes or name.
+    """
+    attrs = coord.attrs
+    return (attrs.get('standard_name') == 'latitude' or
+            attrs.get('units') in ('degrees_north', 'degree_north') or
+            str(coord.name).lower().startswith('lat'))
+
+
+class NearestCell(object):
+    """
+    Find the cell of a grid with multi-dimensional coordinates nearest to
+    a point.
+
+    The tree over the cells is built once, after which each query takes
+    logarithmic time, instead of computing the distance to every cell.
+    Cells with NaN coordinates are never returned. Without scipy, queries
+    fall back to a brute-force search, which is still correct.
+
+    Geographic coordinates are mapped to points on the unit sphere, see
+    ``unit_vectors``, so that the distances are correct across the
+    antimeridian and near the poles. Other coordinates, e.g. in metres or
+    in index space, are compared as they are.
+
+    Parameters
+    ----------
+    x, y: xarray.DataArray
+        The coordinates of the cells, longitudes and latitudes in degrees
+        if geographic. They may have any number of dims, and differing
+        dims: the cells span the union of the dims, i.e. the coordinates
+        broadcast against each other.
+    geographic: bool
+        By default, whether ``y`` holds latitudes, see ``is_latitude``.
+    """
+
+    def __init__(self, x, y, geographic=None):
+        if geographic is None:
+            geographic = is_latitude(y)
+        self.geographic = geographic
+        x, y = xr.broadcast(x, y)
+        y = y.transpose(*x.dims)
+        self.dims = x.dims
+        self.shape = x.shape
+        x, y = np.asarray(x).ravel(), np.asarray(y).ravel()
+        valid = np.isfinite(x) & np.isfinite(y)
+        self.cells = np.flatnonzero(valid)
+        self.points = self._points(x[valid], y[valid])
+        self.tree = None if cKDTree is None else cKDTree(self.points)
+
+    def _points(self, x, y):
+        if self.geographic:
+            return unit_vectors(x, y)
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float),
+                                   np.asarray(y, dtype=float))
+        return np.stack([x, y], axis=-1)
+
+    def query(self, x, y):
+        """
+        Positions of the cell nearest to ``(x, y)``, as a
+        ``{dim: position}`` mapping.
+
+        ``x`` and ``y`` may also be arrays of points, which are all
+        looked up at once; the positions are then arrays too.
+        """
+        points = self._points(x, y)
+        if self.tree is not None:
+            _, nearest = self.tree.query(points)
+        else:
+            nearest = np.array(
+                [np.argmin(((self.points - point) ** 2).sum(axis=1))
+                 for point in points.reshape(-1, points.shape[-1])]
+            ).reshape(points.shape[:-1])
+        index = np.unravel_index(self.cells[nearest], self.shape)
+        if np.ndim(nearest):
+            return dict(zip(self.dims, index))
+        return {dim: int(i) for dim, i in zip(self.dims, index)}
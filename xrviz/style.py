@@ -33,13 +33,22 @@ class Style(SigSlot):
             - ``lower limit``: auto-filled value equals ``quantile(0.1)`` of values to be plotted.
             - ``upper limit``: auto-filled value equals ``quantile(0.9)`` of values to be plotted.
 
+            For arrays of more than ``cmap exact size`` values (default a
+            million), the quantiles are estimated from a random sample of
+            ``cmap sample size`` values (default 100,000, which keeps them
+            within about 0.5% in rank of the exact ones). The bound on
+            this error is shown next to the auto-filled limits.
+
             In case of dask array, `dask.array.percentile <https://docs.dask.org/en/latest/array-api.html#dask.array.percentile>`_
             is use to compute the limits. ``tdigest`` method is used in case `crick <https://pypi.org/project/crick/>`_ is present.
             The value of limits is rounded off to 5 decimal places, for simplicity.
 
             Note that these values are filled with respect to color scaled
             values. Also these limits clear upon change in variable or
-            color scaling.
+            color scaling. When only the color scaling changes, the new
+            limits are derived from the quantiles of the unscaled values
+            (as long as the scaling is monotonic over them), without
+            reading the data again.
 
         6. ``compute min/max from all data`` (default `False`):
             - ``True``: all values present in a data variable are used to compute upper and lower colormap limits.
@@ -69,6 +78,14 @@ class Style(SigSlot):
                                                 width=140)
         self.upper_limit = pn.widgets.TextInput(name='cmap upper limit',
                                                 width=140)
+        self.limits_error = pn.widgets.StaticText(name='cmap limits error',
+                                                  value='', width=140)
+        self.sample_size = pn.widgets.IntInput(name='cmap sample size',
+                                               value=100000, start=100,
+                                               width=140)
+        self.max_exact_size = pn.widgets.IntInput(name='cmap exact size',
+                                                  value=1000000, start=0,
+                                                  width=140)
         self.use_all_data = pn.widgets.Checkbox(name='compute min/max from all data', value=False)
 
         scaling_ops = ['linear', 'exp', 'log', 'reciprocal', 'square', 'sqrt']
@@ -79,13 +96,16 @@ class Style(SigSlot):
 
         self._register(self.use_all_data, 'clear_cmap_limits')
         self._register(self.color_scale, 'clear_cmap_limits')
+        self._register(self.sample_size, 'clear_cmap_limits')
+        self._register(self.max_exact_size, 'clear_cmap_limits')
         self.connect('clear_cmap_limits', self.setup)
 
         self.panel = pn.Column(
             pn.pane.Markdown(TEXT, margin=(0, 10)),
             pn.Row(self.frame_height, self.frame_width),
             pn.Row(self.cmap, self.color_scale),
-            pn.Row(self.lower_limit, self.upper_limit),
+            pn.Row(self.lower_limit, self.upper_limit, self.limits_error),
+            pn.Row(self.sample_size, self.max_exact_size),
             pn.Row(self.use_all_data, self.colorbar, self.rasterize),
             name='Style'
         )
@@ -94,6 +114,7 @@ class Style(SigSlot):
         #  Clears cmap limits
         self.lower_limit.value = ""
         self.upper_limit.value = ""
+        self.limits_error.value = ""
 
     def setup_initial_values(self, init_params={}):
         """
@@ -0,0 +1,86 @@
+import dask.array
+import numpy as np
+import xarray as xr
+import pytest
+from ..aggregation import (plan_reductions, reduce_data, count_valid,
+                           split_selection)
+
+
+@pytest.fixture(scope='module')
+def cube():
+    data = np.random.RandomState(0).rand(4, 3, 5, 6)
+    data[0, 0, 0, :3] = np.nan
+    return xr.DataArray(data, dims=['time', 'member', 'y', 'x'],
+                        name='cube')
+
+
+def test_plan_reductions_groups_same_aggregation(cube):
+    plan = plan_reductions(cube, [('member', 'max'), ('time', 'max')])
+    assert plan == [('max', ['member', 'time'])]
+
+
+def test_plan_reductions_keeps_order_of_mixed_aggregations(cube):
+    plan = plan_reductions(cube, [('member', 'max'), ('time', 'mean')])
+    assert plan == [('max', ['member']), ('mean', ['time'])]
+    xr.testing.assert_allclose(reduce_data(cube, plan),
+                               cube.max('member').mean('time'))
+    plan = plan_reductions(cube, [('time', 'mean'), ('member', 'max'),
+                                  ('y', 'mean')])
+    assert plan == [('mean', ['time']), ('max', ['member']), ('mean', ['y'])]
+
+
+def test_plan_reductions_keeps_order_of_means_and_sums(cube):
+    # NaNs are skipped, so means and sums do not commute either
+    plan = plan_reductions(cube, [('member', 'sum'), ('time', 'mean')])
+    assert plan == [('sum', ['member']), ('mean', ['time'])]
+    xr.testing.assert_allclose(reduce_data(cube, plan),
+                               cube.sum('member').mean('time'))
+    plan = plan_reductions(cube, [('member', 'mean'), ('time', 'sum'),
+                                  ('y', 'mean')])
+    assert plan == [('mean', ['member']), ('sum', ['time']), ('mean', ['y'])]
+    xr.testing.assert_allclose(reduce_data(cube, plan),
+                               cube.mean('member').sum('time').mean('y'))
+
+
+def test_reduce_data_fused_max(cube):
+    plan = plan_reductions(cube, [('member', 'max'), ('time', 'max')])
+    expected = cube.max('member').max('time')
+    xr.testing.assert_allclose(reduce_data(cube, plan), expected)
+
+
+def test_reduce_data_count_over_several_dims(cube):
+    plan = plan_reductions(cube, [('member', 'count'), ('time', 'count')])
+    out = reduce_data(cube, plan)
+    assert out.dims == ('y', 'x')
+    assert int(out[0, 0]) == 11 and int(out[0, 5]) == 12
+
+
+@pytest.mark.parametrize('dims', ['time', ['member', 'time'], ['time', 'x']])
+def test_count_valid(cube, dims):
+    expected = (~ cube.isnull()).sum(dims)
+    out = count_valid(cube, dims)
+    assert out.dtype == 'int16'
+    xr.testing.assert_equal(out, expected.astype('int16'))
+
+
+def test_count_valid_dask(cube):
+    chunked = cube.chunk({'time': 1, 'member': 2})
+    out = count_valid(chunked, ['member', 'time'])
+    assert isinstance(out.data, dask.array.Array)
+    expected = (~ cube.isnull()).sum(['member', 'time'])
+    xr.testing.assert_equal(out.compute(), expected.astype('int16'))
+
+
+def test_split_selection(cube):
+    plan = plan_reductions(cube, [('member', 'mean')])
+    before, after = split_selection({'time': 1, 'member': 0}, plan)
+    assert before == {'time': 1}
+    assert after == {'member': 0}
+
+
+def test_selection_before_reduction_matches(cube):
+    plan = plan_reductions(cube, [('member', 'mean'), ('y', 'max')])
+    before, _ = split_selection({'time': 2}, plan)
+    expected = reduce_data(cube, plan).isel(time=2, drop=True)
+    out = reduce_data(cube.isel(**before, drop=True), plan)
+    xr.testing.assert_identical(out, expected)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from ..cache import LRUCache, nbytes
+
+
+def test_nbytes():
+    assert nbytes(np.zeros(10)) == 80
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_bytes=250)
+    cache['a'] = np.zeros(10)
+    cache['b'] = np.zeros(10)
+    cache['a']  # 'a' is now the most recently used
+    cache['c'] = np.zeros(10)
+    assert cache.keys() == ['b', 'a', 'c']
+    cache['d'] = np.zeros(10)
+    assert cache.keys() == ['a', 'c', 'd']
+    assert cache.total_bytes == 240
+
+
+def test_lru_cache_skips_oversized_values():
+    cache = LRUCache(max_bytes=50)
+    cache['a'] = np.zeros(10)
+    assert 'a' not in cache
+    assert cache.total_bytes == 0
+    with pytest.raises(KeyError):
+        cache['a']
+
+
+def test_lru_cache_replace_and_clear():
+    cache = LRUCache(max_bytes=1000)
+    cache['a'] = np.zeros(10)
+    cache['a'] = np.zeros(20)
+    assert len(cache) == 1 and cache.total_bytes == 160
+    cache.clear()
+    assert len(cache) == 0 and cache.total_bytes == 0
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+import xarray as xr
+from . import data
+from ..chunks import auto_chunks, frame_dim, parse_chunks
+
+
+def test_frame_dim(data):
+    assert frame_dim(data) == 'time'
+    renamed = xr.Dataset(coords={'t': np.array(['2000-01-01'],
+                                               dtype='datetime64[ns]')})
+    assert frame_dim(renamed) == 't'
+    assert frame_dim(data.isel(time=0, drop=True)) is None
+
+
+def test_auto_chunks_one_frame_per_chunk(data):
+    chunks = auto_chunks(data)
+    assert chunks['time'] == 1
+    assert all(chunks[dim] == size for dim, size in data.sizes.items()
+               if dim != 'time')
+    chunked = data.chunk(chunks)
+    assert chunked.temp.data.numblocks[0] == data.sizes['time']
+    assert chunked.temp.data.numblocks[1:] == (1, 1, 1)
+
+
+def test_auto_chunks_within_budget(data):
+    itemsize = data.temp.dtype.itemsize
+    # room for one level of one frame
+    chunks = auto_chunks(data, max_bytes=itemsize * data.sizes['ny'] *
+                         data.sizes['nx'])
+    assert chunks['time'] == 1 and chunks['sigma'] == 1
+    assert chunks['ny'] == data.sizes['ny']
+    # half a level
+    chunks = auto_chunks(data, max_bytes=itemsize * data.sizes['ny'] *
+                         data.sizes['nx'] // 2)
+    assert chunks['sigma'] == 1
+    assert chunks['nx'] == data.sizes['nx'] // 2
+
+
+def test_parse_chunks():
+    assert parse_chunks('time=1, nx=auto,ny=-1') == {'time': 1, 'nx': 'auto',
+                                                     'ny': -1}
+    with pytest.raises(ValueError):
+        parse_chunks('time')
@@ -1,10 +1,25 @@
+import dask.array
+import numpy as np
 import xarray as xr
 import panel as pn
-from xrviz.dashboard import Dashboard, find_cmap_limits
+import holoviews as hv
+from xrviz.dashboard import Dashboard, describe_limits_error, find_cmap_limits
+from xrviz.limits import approx_quantiles
+from ..viewport import BoxIndex
+from .test_raster import datashader_works
 import pytest
 from . import data
 from ..utils import _is_coord
-from ..compatibility import has_cartopy, has_crick_tdigest
+from ..compatibility import has_cartopy, has_crick_tdigest, pyproj
+from dask.callbacks import Callback
+
+
+class CountComputes(Callback):
+    # counts the graphs computed by dask while active
+    count = 0
+
+    def _start(self, dsk):
+        self.count += 1
 
 
 @pytest.fixture(scope='module')
@@ -140,6 +155,27 @@ def test_with_is_geo_basemap(dashboard):
     assert isinstance(dashboard.output[1][0], pn.widgets.select.Select)
 
 
+@pytest.mark.skipif(not has_cartopy, reason='cartopy not present')
+def test_taps_in_projection(data):
+    dashboard = Dashboard(data)
+    dashboard.control.coord_setter.coord_selector.value = ['lat', 'lon']
+    dashboard.control.displayer.select_variable('temp')
+    proj_panel = dashboard.control.projection
+    proj_panel.is_geo.value = True
+    proj_panel.basemap.value = None
+    proj_panel.projection.value = 'Orthographic'
+    proj_panel.proj_params.value = "{'central_longitude': -78, 'central_latitude': 43, 'globe': None}"
+    dashboard.create_graph()
+    projection = dashboard._projected[1]
+    taps = dashboard.create_taps_graph(None, None)
+    assert taps.crs == projection
+
+    proj_panel.basemap.value = 'OSM'
+    dashboard.create_graph()
+    taps = dashboard.create_taps_graph(None, None)
+    assert taps.crs == dashboard._projected[1] != projection
+
+
 def test_with_aggregations_for_dims(dashboard):
     dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
     dashboard.control.displayer.select_variable('temp')
@@ -204,6 +240,215 @@ def test_create_taps_and_series_graph_for_dims(dashboard):
     assert isinstance(dashboard.series_graph[0], pn.pane.holoviews.HoloViews)
 
 
+def test_extract_series_for_many_points_in_one_read(data):
+    dashboard = Dashboard(data.chunk({'time': 1, 'nx': 10}))
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.s_selector.value = 'sigma'
+    dashboard.create_graph()
+    points = [(35, 10), (2.2, 3.9), (17, 29)]
+    with CountComputes() as computes:
+        series = dashboard.extract_series(points)
+    assert computes.count == 1
+    assert series.dims == ('point', 'sigma')
+    for (x, y), values in zip([(35, 10), (2, 4), (17, 29)], series.values):
+        expected = data.temp.isel(time=0, nx=x, ny=y).values
+        np.testing.assert_array_equal(values, expected)
+
+
+def test_extract_series_with_named_dim():
+    data = xr.Dataset(
+        {'var': (('member', 'time', 'ny', 'nx'), np.random.rand(3, 4, 5, 6))},
+        coords={'member': ['b', 'a', 'c'], 'time': np.arange(4),
+                'ny': np.arange(5), 'nx': np.arange(6)})
+    dashboard = Dashboard(data)
+    dashboard.control.displayer.select_variable('var')
+    dashboard.control.fields.x.value = 'nx'
+    dashboard.control.fields.y.value = 'ny'
+    dashboard.control.fields.s_selector.value = 'time'
+    dashboard.create_graph()
+    member = dashboard.selector_dims.index('member')
+    dashboard.index_selectors[member].value = 'c'
+    series = dashboard.extract_series([(2, 3)])
+    np.testing.assert_array_equal(series[0],
+                                  data['var'].isel(member=2, nx=2, ny=3))
+    stats = dashboard.extract_region((1, 1, 2, 2))
+    np.testing.assert_allclose(
+        stats['max'], data['var'].isel(member=2, nx=slice(1, 3),
+                                       ny=slice(1, 3)).max(['ny', 'nx']))
+
+
+def test_series_cache(data):
+    dashboard = Dashboard(data.chunk({'time': 1}))
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.s_selector.value = 'sigma'
+    dashboard.create_graph()
+    first = dashboard.extract_series([(35, 10), (2, 4)])
+    with CountComputes() as computes:
+        # the tap at (2.2, 3.9) resolves to the cell of (2, 4)
+        again = dashboard.extract_series([(2.2, 3.9), (35, 10)])
+    assert computes.count == 0
+    np.testing.assert_array_equal(again.values, first.values[::-1])
+    with CountComputes() as computes:
+        dashboard.extract_series([(35, 10), (17, 29)])
+    assert computes.count == 1
+    assert len(dashboard.series_cache) == 3
+
+    # another time step is another series
+    time = dashboard.index_selectors[dashboard.selector_dims.index('time')]
+    time.value = time.options[1]
+    series = dashboard.extract_series([(35, 10)])
+    expected = data.temp.isel(time=1, nx=35, ny=10).values
+    np.testing.assert_array_equal(series.values[0], expected)
+    assert len(dashboard.series_cache) == 4
+
+
+def test_series_extracted_in_background(data):
+    import threading
+    dashboard = Dashboard(data)
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.s_selector.value = 'sigma'
+    dashboard.create_graph()
+    release = threading.Event()
+    extract_series = dashboard.extract_series
+
+    def slow_extract_series(points):
+        release.wait()
+        return extract_series(points)
+
+    dashboard.extract_series = slow_extract_series
+    dashboard.create_taps_graph(x=35, y=10)
+    # a placeholder is plotted while the series is read
+    placeholder = dashboard.series[()].last
+    assert isinstance(placeholder, hv.Curve) and len(placeholder) == 0
+    release.set()
+    dashboard.wait_for_series()
+    curve = dashboard.series[()].last
+    assert len(curve) == data.sizes['sigma']
+    assert dashboard.series_graph[0].object is dashboard.series
+
+
+def test_series_added_incrementally(data):
+    dashboard = Dashboard(data)
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.s_selector.value = 'sigma'
+    dashboard.create_graph()
+    plot = hv.renderer('bokeh').get_plot(dashboard.series)
+    dashboard.create_taps_graph(x=35, y=10)
+    dashboard.wait_for_series()
+    source = plot.subplots[(1,)].handles['source']
+    changes = []
+    source.on_change('data', lambda attr, old, new: changes.append(attr))
+    dashboard.create_taps_graph(x=5, y=20)
+    dashboard.wait_for_series()
+    assert len(plot.subplots) == 3
+    # the data of the first series was not sent again
+    assert changes == []
+    assert len(plot.subplots[(2,)].handles['source'].data['temp']) == \
+        data.sizes['sigma']
+
+
+def test_series_extracted_from_state_at_tap(data):
+    import threading
+    dashboard = Dashboard(data)
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.s_selector.value = 'sigma'
+    dashboard.create_graph()
+    time = dashboard.selector_dims.index('time')
+    # hold the worker until the selector has changed
+    release = threading.Event()
+    dashboard._series_pool.submit(release.wait)
+    dashboard.create_taps_graph(x=35, y=10)
+    dashboard.index_selectors[time].value = data.time.values[2]
+    release.set()
+    dashboard.wait_for_series()
+    curve = dashboard.series[()].last
+    expected = data.temp.isel(time=0, nx=35, ny=10)
+    np.testing.assert_array_equal(curve.dimension_values('temp'), expected)
+    key, = dashboard.series_cache.keys()
+    assert key[3] == (('time', 0),)
+
+
+def test_series_swapped_in_on_calling_thread(data):
+    import threading
+    dashboard = Dashboard(data)
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.s_selector.value = 'sigma'
+    dashboard.create_graph()
+    threads = []
+    overlay_series = dashboard._overlay_series
+
+    def record():
+        threads.append(threading.current_thread())
+        overlay_series()
+
+    dashboard._overlay_series = record
+    dashboard.create_taps_graph(x=35, y=10)
+    dashboard.wait_for_series()
+    assert len(threads) == 2
+    assert set(threads) == {threading.main_thread()}
+
+
+def test_long_series_downsampled():
+    time = np.arange(20000)
+    data = xr.Dataset(
+        {'var': (('time', 'ny', 'nx'), np.random.rand(20000, 2, 3))},
+        coords={'time': time, 'ny': [0, 1], 'nx': [0, 1, 2]})
+    dashboard = Dashboard(data)
+    dashboard.control.displayer.select_variable('var')
+    dashboard.control.fields.s_selector.value = 'time'
+    dashboard.create_graph()
+    dashboard.create_taps_graph(x=1, y=1)
+    dashboard.wait_for_series()
+    frame_width = dashboard.kwargs['frame_width']
+    curve = dashboard.series[()].last
+    assert len(curve) <= 2 * frame_width + 2
+    assert curve.dimension_values('var').max() == data['var'][:, 1, 1].max()
+
+    # zooming in shows the full resolution of the range
+    dashboard._series_range.event(x_range=(1000, 1500))
+    curve = dashboard.series[()].last
+    np.testing.assert_array_equal(curve.dimension_values('time'),
+                                  np.arange(999, 1502))
+
+    # series added while zoomed in are shown in the range too
+    dashboard.create_taps_graph(x=2, y=0)
+    dashboard.wait_for_series()
+    assert dashboard._series_range.x_range == (1000, 1500)
+    curve = dashboard.series[()].last
+    np.testing.assert_array_equal(curve.dimension_values('time'),
+                                  np.arange(999, 1502))
+    np.testing.assert_array_equal(curve.dimension_values('var'),
+                                  data['var'][999:1502, 0, 2])
+
+
+def test_series_redrawn_after_variable_change(data):
+    dashboard = Dashboard(data)
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.s_selector.value = 'sigma'
+    dashboard.create_graph()
+    dashboard.create_taps_graph(x=35, y=10)
+    dashboard.create_taps_graph(x=5, y=20)
+    dashboard.control.displayer.select_variable('u')
+    dashboard.control.fields.s_selector.value = 'sigma'
+    dashboard.create_graph()
+    dashboard.wait_for_series()
+    assert len(dashboard.taps) == 2
+    # the two series and the initial empty element
+    overlay = dashboard.series[()]
+    assert len(overlay) == 3
+    np.testing.assert_array_equal(
+        overlay[2].dimension_values('u'),
+        data.u.isel(time=0, nx=5, ny=20).values)
+    assert isinstance(dashboard.series_graph[0], pn.pane.holoviews.HoloViews)
+
+
 def test_create_taps_and_series_graph_for_2d_coords(dashboard):
     dashboard.control.coord_setter.coord_selector.value = ['lat', 'lon']
     dashboard.control.displayer.select_variable('temp')
@@ -213,9 +458,438 @@ def test_create_taps_and_series_graph_for_2d_coords(dashboard):
     assert isinstance(dashboard.series_graph[0], pn.pane.holoviews.HoloViews)
 
 
+def test_create_series_graph_for_multi_dim_coords(data):
+    # coords which differ at each level
+    lon = (data.lon + 0.001 * data.sigma).transpose('sigma', 'ny', 'nx')
+    lat = (data.lat + 0 * lon).transpose('sigma', 'ny', 'nx')
+    data = data.assign_coords(lon_3d=lon, lat_3d=lat)
+    dashboard = Dashboard(data)
+    dashboard.control.coord_setter.coord_selector.value = ['lat_3d', 'lon_3d']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.x.value = 'lon_3d'
+    dashboard.control.fields.y.value = 'lat_3d'
+    dashboard.control.fields.s_selector.value = 'time'
+    dashboard.create_graph()
+    lon, lat = data.lon_3d.values[2, 3, 7], data.lat_3d.values[2, 3, 7]
+    assert dashboard.nearest_cell(lon, lat) == {'sigma': 2, 'ny': 3, 'nx': 7}
+    dashboard.create_taps_graph(x=lon, y=lat)
+    assert isinstance(dashboard.series_graph[0], pn.pane.holoviews.HoloViews)
+
+
+def test_nearest_cell_index_cached(dashboard):
+    dashboard.control.coord_setter.coord_selector.value = ['lat', 'lon']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.create_graph()
+    dashboard.nearest_cells.clear()
+    lon, lat = dashboard.data.lon.values, dashboard.data.lat.values
+    j, i = 3, 7
+    # x is lat here
+    assert dashboard.nearest_cell(lat[j, i], lon[j, i]) == {'ny': j, 'nx': i}
+    index = dashboard.nearest_cells[('lon', 'lat')]
+    dashboard.nearest_cell(lat[0, 0], lon[0, 0])
+    assert dashboard.nearest_cells == {('lon', 'lat'): index}
+
+
 @pytest.mark.skipif(not has_crick_tdigest, reason='crick.tdigest not present')
 def test_find_cmap_limits_with_crick_tdigest():
     ds = xr.tutorial.open_dataset('air_temperature',
                                   chunks={'lat': 25, 'lon': 25, 'time': 10})
     a, b = find_cmap_limits(ds.air)
     assert abs(a - 255.38780056044027) < 0.1 and abs(b - 298.5900340551101) < 0.1
+
+
+def test_aggregation_cache_reused_on_replot(dashboard):
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    agg_selectors = dashboard.control.fields.agg_selectors
+    agg_selectors[0].value = 'mean'
+    agg_selectors[1].value = 'max'
+    dashboard.agg_cache.clear()
+    dashboard.plot_button.clicks += 1
+    assert len(dashboard.agg_cache) == 1
+    cached = dashboard.aggregate_data()
+    dashboard.plot_button.clicks += 1
+    assert len(dashboard.agg_cache) == 1
+    assert dashboard.aggregate_data() is cached
+
+
+@pytest.mark.parametrize('cache_size, persisted', [(2**30, True),
+                                                   (1000, False)])
+def test_aggregation_persisted_within_budget(data, cache_size, persisted):
+    dashboard = Dashboard(data.chunk({'time': 1}), cache_size=cache_size)
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.agg_selectors[0].value = 'mean'
+    dashboard.create_graph()
+    aggregated = dashboard.aggregate_data().data
+    assert isinstance(aggregated, dask.array.Array)
+    # a persisted array has a single task per chunk
+    assert (len(aggregated.dask) == aggregated.npartitions) is persisted
+    key = dashboard._aggregation_task({})[0]
+    assert (key in dashboard.agg_cache) is persisted
+
+
+def test_aggregate_data_selects_before_aggregating(dashboard):
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    agg_selectors = dashboard.control.fields.agg_selectors
+    agg_selectors[0].value = 'mean'
+    agg_selectors[1].value = 'animate'
+    dashboard.create_graph()
+    time = dashboard.data.time.values[1]
+    dashboard.agg_cache.clear()
+    frame = dashboard.aggregate_data({'time': time})
+    assert frame.dims == ('ny', 'nx')
+    dashboard.agg_cache.clear()
+    expected = dashboard.aggregate_data().sel(time=time, drop=True)
+    xr.testing.assert_identical(frame, expected)
+
+
+def test_prefetch_animated_frames(data):
+    dashboard = Dashboard(data.chunk({'time': 1}))
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    agg_selectors = dashboard.control.fields.agg_selectors
+    agg_selectors[0].value = 'mean'
+    agg_selectors[1].value = 'animate'
+    dashboard.create_graph()
+    player = dashboard.index_selectors[0]
+    player.value = player.options[1]
+    assert dashboard.prefetcher.pending or len(dashboard.agg_cache) > 1
+    key, compute = dashboard._indexed_frame_task({'time': player.options[2]})
+    frame = dashboard.prefetcher.get(key, compute)
+    assert key in dashboard.agg_cache
+    expected = data.temp.mean('sigma').sel(time=player.options[2], drop=True)
+    xr.testing.assert_allclose(frame, expected)
+
+
+def test_find_cmap_limits_sampled_for_large_arrays():
+    values = xr.DataArray(np.arange(1000000.).reshape(1000, 1000))
+    lower, upper = find_cmap_limits(values, sample_size=50000,
+                                    max_exact_size=1000)
+    assert abs(lower - 100000) < 5000 and abs(upper - 900000) < 5000
+
+
+def test_cmap_limits_derived_on_color_scale_change(dashboard):
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    style = dashboard.control.style
+    style.use_all_data.value = False
+    style.color_scale.value = 'linear'
+    dashboard.cmap_sketches.clear()
+    dashboard.create_graph()
+    lower = float(style.lower_limit.value)
+    assert len(dashboard.cmap_sketches) == 1
+    style.color_scale.value = 'log'
+    assert style.lower_limit.value == ''
+    dashboard.create_graph()
+    assert len(dashboard.cmap_sketches) == 1
+    assert abs(float(style.lower_limit.value) - np.log(lower)) < 1e-4
+
+
+def test_cmap_limits_sample_options(dashboard):
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    style = dashboard.control.style
+    style.use_all_data.value = False
+    style.color_scale.value = 'linear'
+    dashboard.cmap_sketches.clear()
+    dashboard.create_graph()
+    assert style.limits_error.value == 'exact'
+    style.max_exact_size.value = 100
+    style.sample_size.value = 1000
+    assert style.limits_error.value == ''
+    dashboard.create_graph()
+    _, error = approx_quantiles(np.arange(2000.), [0.5], sample_size=1000)
+    assert style.limits_error.value == describe_limits_error(error)
+    assert len(dashboard.cmap_sketches) == 2
+    style.max_exact_size.value = 1000000
+    style.sample_size.value = 100000
+
+
+def test_describe_limits_error():
+    assert describe_limits_error(0.) == 'exact'
+    assert describe_limits_error(None) == 'estimated by dask'
+    assert describe_limits_error(0.00515) == '\u00b10.52% in rank'
+
+
+def test_color_scale_applied_per_frame(dashboard):
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.kwargs['color_scale'] = 'log'
+    data = dashboard.data['temp']
+    scaled = dashboard._color_scale(data, ['time'])
+    assert isinstance(scaled.data, dask.array.Array)
+    assert scaled.chunks[data.get_axis_num('time')] == (1,) * data.sizes['time']
+    frame = scaled.isel(time=1).values
+    np.testing.assert_allclose(frame, np.log(data.isel(time=1).values))
+    dashboard.kwargs['color_scale'] = 'linear'
+    assert dashboard._color_scale(data, ['time']) is data
+
+
+def test_first_frame_read_once_for_cmap_limits(data):
+    dashboard = Dashboard(data.chunk({'time': 1}))
+    dashboard.control.coord_setter.coord_selector.value = ['lat', 'lon']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.style.use_all_data.value = False
+    with CountComputes() as computes:
+        dashboard.create_graph()
+    assert computes.count == 1
+    # the frame read for the cmap limits is the one displayed first
+    frames = list(dashboard.agg_cache.keys())
+    assert len(frames) == 1
+    expected = data.temp.isel(time=0, sigma=0).values
+    np.testing.assert_array_equal(dashboard.agg_cache[frames[0]], expected)
+
+
+def test_region_series(data):
+    dashboard = Dashboard(data)
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.s_selector.value = 'sigma'
+    dashboard.create_graph()
+    dashboard.region_stream.event(bounds=(5, 10, 9, 14))
+    dashboard.lasso_stream.event(
+        geometry=np.array([[5, 10], [9, 10], [9, 14], [5, 14]]))
+    dashboard.wait_for_series()
+    assert len(dashboard.regions) == 2
+    time = dashboard._other_dim_sels()['time']
+    inside = data.temp.sel(time=time).isel(nx=slice(5, 10), ny=slice(10, 15))
+    overlay = dashboard.series[()]
+    # the mean, min and max of each region, and the initial empty element
+    assert len(overlay) == 7
+    mean, high = overlay[1], overlay[3]
+    np.testing.assert_allclose(mean.dimension_values('temp'),
+                               inside.mean(['ny', 'nx']))
+    np.testing.assert_allclose(mean.dimension_values('std'),
+                               inside.std(['ny', 'nx']))
+    np.testing.assert_allclose(high.dimension_values('temp'),
+                               inside.max(['ny', 'nx']))
+    assert len(overlay[4]) == data.sizes['sigma']
+
+    dashboard.clear_series()
+    assert dashboard.regions == []
+
+
+@pytest.mark.parametrize('coords, rasterize', [
+    (['time', 'sigma'], True), (['time', 'sigma'], False),
+    (['lat', 'lon'], False),
+    pytest.param(['lat', 'lon'], True, marks=pytest.mark.skipif(
+        not datashader_works(),
+        reason='datashader does not work with this numpy'))])
+def test_region_tools_on_graph(data, coords, rasterize):
+    dashboard = Dashboard(data)
+    dashboard.control.coord_setter.coord_selector.value = coords
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.x.value = 'lon' if 'lon' in coords else 'nx'
+    dashboard.control.fields.y.value = 'lat' if 'lat' in coords else 'ny'
+    dashboard.control.fields.s_selector.value = 'sigma'
+    dashboard.control.style.rasterize.value = rasterize
+    dashboard.create_graph()
+    graph = dashboard.output[0]
+    graph = getattr(graph, 'object', None) or graph[0].object
+    plot = hv.renderer('bokeh').get_plot(graph)
+    tools = {type(tool).__name__ for tool in plot.state.tools}
+    assert {'BoxSelectTool', 'LassoSelectTool', 'HoverTool'} <= tools
+
+
+def test_region_series_weighted_by_latitude(dashboard):
+    dashboard.control.coord_setter.coord_selector.value = ['lat', 'lon']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.x.value = 'lon'
+    dashboard.control.fields.y.value = 'lat'
+    dashboard.control.fields.s_selector.value = 'sigma'
+    dashboard.create_graph()
+    lon, lat = dashboard.data.lon, dashboard.data.lat
+    bounds = (float(lon.min()), float(lat.min()),
+              float(lon.max()), float(lat.max()))
+    stats = dashboard.extract_region(bounds)
+    temp = dashboard.data.temp.sel(time=dashboard._other_dim_sels()['time'])
+    weights = np.cos(np.deg2rad(lat))
+    np.testing.assert_allclose(stats['mean'],
+                               temp.weighted(weights).mean(['ny', 'nx']))
+    assert dashboard.extract_region(bounds) is stats
+
+
+def test_series_follow_aggregations(data):
+    dashboard = Dashboard(data)
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    fields = dashboard.control.fields
+    fields.s_selector.value = 'sigma'
+    time = sorted(fields.remaining_dims).index('time')
+    fields.agg_selectors[time].value = 'mean'
+    dashboard.agg_cache.clear()
+    dashboard.create_graph()
+    # only frames were aggregated for the graph, so the series is reduced
+    # at the tapped column
+    key = dashboard._aggregation_task({})[0]
+    assert key not in dashboard.agg_cache
+    series = dashboard.extract_series([(35, 10)])
+    np.testing.assert_allclose(series[0],
+                               data.temp.isel(nx=35, ny=10).mean('time'))
+    stats = dashboard.extract_region((5, 10, 9, 14))
+    np.testing.assert_allclose(
+        stats['max'],
+        data.temp.isel(nx=slice(5, 10), ny=slice(10, 15)).mean('time').max(
+            ['ny', 'nx']))
+
+    # the aggregated variable is reused when it was computed for the graph
+    whole = data.temp.mean('time') + 100
+    dashboard.agg_cache[key] = whole
+    series = dashboard.extract_series([(5, 20)])
+    np.testing.assert_allclose(series[0], whole.isel(nx=5, ny=20))
+
+
+def test_regular_grid_plotted_as_image(data):
+    dashboard = Dashboard(data)
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.style.rasterize.value = False
+    dashboard.create_graph()
+    assert dashboard.plot_kind() == 'image'
+    assert dashboard.regular_coords == {'nx': True, 'ny': True}
+    assert isinstance(dashboard.graph, hv.Image)
+    dashboard.control.style.rasterize.value = True
+    dashboard.create_graph()
+    hv.renderer('bokeh').get_plot(dashboard.output[0].object)
+
+    dashboard.control.coord_setter.coord_selector.value = ['lat', 'lon']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.create_graph()
+    assert dashboard.plot_kind() == 'quadmesh'
+
+
+def test_graph_sliced_to_viewport(data):
+    dashboard = Dashboard(data)
+    dashboard.control.coord_setter.coord_selector.value = ['time', 'sigma']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.create_graph()
+    assert dashboard.viewport_box(None, None) == {}
+    box = dashboard.viewport_box((5, 9), (10, 14))
+    assert box == {'nx': slice(4, 11), 'ny': slice(9, 16)}
+    frame = dashboard.data.temp.isel(time=0, sigma=0).assign_coords(
+        nx=data.nx, ny=data.ny).hvplot.image(x='nx', y='ny')
+    view = dashboard._viewport(frame, x_range=(5, 9), y_range=(10, 14))
+    assert isinstance(view, hv.Image)
+    assert dict(view.data.sizes) == {'nx': 7, 'ny': 7}
+    assert view.range('nx') == (3.5, 10.5)
+    hv.renderer('bokeh').get_plot(dashboard.output[0].object)
+
+    dashboard.control.coord_setter.coord_selector.value = ['lat', 'lon']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.x.value = 'lon'
+    dashboard.control.fields.y.value = 'lat'
+    dashboard.create_graph()
+    # tiles smaller than the grid, which is smaller than the default ones
+    dashboard.viewport_indexes[('lon', 'lat')] = BoxIndex(data.lon, data.lat,
+                                                          tile=4)
+    lon, lat = data.lon.values[3, 7], data.lat.values[3, 7]
+    frame = dashboard.data.temp.isel(time=0, sigma=0).hvplot.quadmesh(
+        x='lon', y='lat')
+    view = dashboard._viewport(frame, x_range=(lon - 1e-3, lon + 1e-3),
+                               y_range=(lat - 1e-3, lat + 1e-3))
+    assert view.data.sizes['nx'] < data.sizes['nx']
+    assert (view.data.lon.values == lon).any()
+    assert dict(view.data.sizes) == {'ny': 8, 'nx': 12}
+
+
+def test_zoomed_out_frames_from_pyramid():
+    size = 1000
+    data = xr.Dataset(
+        {'var': (('time', 'ny', 'nx'), np.random.rand(2, size, size))},
+        coords={'time': [0, 1], 'ny': np.arange(size),
+                'nx': np.arange(size)})
+    dashboard = Dashboard(data)
+    dashboard.control.displayer.select_variable('var')
+    dashboard.control.style.frame_width.value = 200
+    dashboard.control.style.frame_height.value = 150
+    dashboard.create_graph()
+    frame = data['var'].sel(time=[1]).squeeze('time').hvplot.image(
+        x='nx', y='ny')
+    view = dashboard._viewport(frame)
+    # the coarsest level with more cells than pixels along x and y
+    assert dict(view.data.sizes) == {'ny': 250, 'nx': 250}
+    np.testing.assert_allclose(
+        view.data['var'][:2, :2],
+        data['var'][1, :8, :8].coarsen(ny=4, nx=4).mean())
+    assert len(dashboard.pyramid.cache) == 2
+
+    # the levels are reused, and finer ones are used when zooming in
+    view = dashboard._viewport(frame, x_range=(0, 499), y_range=(0, 499))
+    assert 250 <= view.data.sizes['nx'] < 300
+    assert len(dashboard.pyramid.cache) == 2
+    view = dashboard._viewport(frame, x_range=(0, 100), y_range=(0, 100))
+    assert dict(view.data.sizes) == {'ny': 112, 'nx': 112}
+
+
+def test_pyramid_levels_follow_index_selectors():
+    size = 1000
+    data = xr.Dataset(
+        {'var': (('time', 'ny', 'nx'), np.random.rand(2, size, size))},
+        coords={'time': [0, 1], 'ny': np.arange(size),
+                'nx': np.arange(size)})
+    dashboard = Dashboard(data)
+    dashboard.control.displayer.select_variable('var')
+    dashboard.control.style.frame_width.value = 200
+    dashboard.control.style.frame_height.value = 150
+    dashboard.create_graph()
+    views = []
+    for time in [0, 1]:
+        dashboard.index_selectors[0].value = time
+        # as selected by `aggregate_data`, without the scalar time coord
+        frame = data['var'].sel(time=time, drop=True).hvplot.image(
+            x='nx', y='ny')
+        views.append(dashboard._viewport(frame).data['var'])
+    assert views[0].shape == views[1].shape == (250, 250)
+    np.testing.assert_allclose(
+        views[1][:2, :2], data['var'][1, :8, :8].coarsen(ny=4, nx=4).mean())
+    assert not np.allclose(views[0], views[1])
+
+
+@pytest.mark.skipif(not datashader_works(),
+                    reason='datashader does not work with this numpy')
+def test_curvilinear_mesh_rasterized_in_parallel(data):
+    dashboard = Dashboard(data)
+    dashboard.control.coord_setter.coord_selector.value = ['lat', 'lon']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.x.value = 'lon'
+    dashboard.control.fields.y.value = 'lat'
+    dashboard.create_graph()
+    frame = dashboard.data.temp.isel(time=0, sigma=0).hvplot.quadmesh(
+        x='lon', y='lat')
+    image = dashboard._rasterize_mesh(frame, width=90, height=60)
+    assert isinstance(image, hv.Image)
+    assert image.dimension_values('temp', flat=False).shape == (60, 90)
+    hv.renderer('bokeh').get_plot(dashboard.output[0].object)
+
+
+@pytest.mark.skipif(pyproj is None, reason='pyproj not present')
+def test_projected_mesh_cached(data):
+    from ..reproject import transform_points
+    dashboard = Dashboard(data)
+    dashboard.control.coord_setter.coord_selector.value = ['lat', 'lon']
+    dashboard.control.displayer.select_variable('temp')
+    dashboard.control.fields.x.value = 'lon'
+    dashboard.control.fields.y.value = 'lat'
+    dashboard.control.fields.s_selector.value = 'sigma'
+    dashboard.create_graph()
+    assert dashboard.projected_mesh() is None
+    # as set by create_graph for a graph projected to Web Mercator
+    dashboard._projected = ('EPSG:4326', 'EPSG:3857',
+                            ('PlateCarree', '{}', 'GOOGLE_MERCATOR', ''))
+    mesh = dashboard.projected_mesh()
+    assert mesh['x'].shape == data.lon.shape
+    assert dashboard.projected_mesh() is mesh
+    assert len(dashboard.projected_meshes) == 1
+
+    # taps in the projection are extracted at the cell of the data
+    lon, lat = data.lon.values[3, 7], data.lat.values[3, 7]
+    xs, ys = transform_points([lon], [lat], 'EPSG:4326', 'EPSG:3857')
+    series = dashboard.extract_series([(xs[0], ys[0])])
+    np.testing.assert_array_equal(
+        series[0], data.temp.isel(time=0, ny=3, nx=7).values)
+
+    # regions are masked on the projected mesh
+    bounds = (xs[0] - 1, ys[0] - 1, xs[0] + 1, ys[0] + 1)
+    stats = dashboard.extract_region(bounds=bounds)
+    np.testing.assert_allclose(stats['mean'], series[0])
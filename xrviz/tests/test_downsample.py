@@ -0,0 +1,27 @@
+import numpy as np
+from ..downsample import minmax_indices
+
+
+def test_minmax_indices_short_series():
+    np.testing.assert_array_equal(minmax_indices(np.arange(10.), 5),
+                                  np.arange(10))
+
+
+def test_minmax_indices_keeps_peaks():
+    values = np.sin(np.linspace(0, 20, 10000))
+    values[1234] = 5
+    values[5678] = -5
+    keep = minmax_indices(values, 100)
+    assert len(keep) <= 2 * 100 + 2
+    assert keep[0] == 0 and keep[-1] == len(values) - 1
+    assert 1234 in keep and 5678 in keep
+    np.testing.assert_array_equal(keep, np.unique(keep))
+    assert values[keep].max() == values.max()
+    assert values[keep].min() == values.min()
+
+
+def test_minmax_indices_keeps_gaps():
+    values = np.arange(1000.)
+    values[500:600] = np.nan
+    keep = minmax_indices(values, 10)
+    assert np.isnan(values[keep]).any()
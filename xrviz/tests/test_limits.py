@@ -0,0 +1,68 @@
+import numpy as np
+import xarray as xr
+import pytest
+from ..limits import approx_quantiles, quantile_sketch, scale_limits
+
+
+def test_approx_quantiles_within_error_bound():
+    values = np.random.RandomState(1).standard_normal((200, 300, 40))
+    values[:, :10] = np.nan
+    (lower, upper), error = approx_quantiles(values, [0.1, 0.9],
+                                             sample_size=20000)
+    valid = np.sort(values[~np.isnan(values)])
+    assert 0 < error < 0.02
+    for estimate, q in [(lower, 0.1), (upper, 0.9)]:
+        rank = np.searchsorted(valid, estimate) / valid.size
+        assert abs(rank - q) <= error
+
+
+def test_approx_quantiles_all_nan():
+    quantiles, error = approx_quantiles(np.full(10, np.nan), [0.1, 0.9])
+    assert np.isnan(quantiles).all() and error == 1
+
+
+@pytest.mark.parametrize('color_scale,expected',
+                         [('linear', (2, 8)),
+                          ('log', (np.log(2), np.log(8))),
+                          ('sqrt', (np.sqrt(2), np.sqrt(8))),
+                          ('reciprocal', (1 / 8, 1 / 2)),
+                          ('square', (4, 64))])
+def test_scale_limits(color_scale, expected):
+    limits = scale_limits((1, 2, 8, 10), color_scale)
+    np.testing.assert_allclose(limits, expected)
+
+
+@pytest.mark.parametrize('sketch,color_scale',
+                         [((-1, 2, 8, 10), 'log'),
+                          ((-1, 2, 8, 10), 'square'),
+                          ((-1, 2, 8, 10), 'reciprocal'),
+                          ((0, 2, 800, 1000), 'exp')])
+def test_scale_limits_not_monotonic(sketch, color_scale):
+    assert scale_limits(sketch, color_scale) is None
+
+
+def test_scale_limits_matches_scaled_quantiles():
+    data = xr.DataArray(np.random.RandomState(0).lognormal(size=(50, 40)))
+    sketch = quantile_sketch(data)
+    expected = [float(q) for q in np.reciprocal(data).quantile([0.1, 0.9])]
+    np.testing.assert_allclose(scale_limits(sketch, 'reciprocal'), expected,
+                               rtol=0.05)
+
+
+def test_quantile_sketch_dask():
+    data = xr.DataArray(np.arange(100.).reshape(10, 10)).chunk(5)
+    vmin, lower, upper, vmax = quantile_sketch(data)
+    assert (vmin, vmax) == (0, 99)
+    assert lower < upper
+
+
+def test_quantile_sketch_error():
+    data = xr.DataArray(np.arange(10000.).reshape(100, 100))
+    sketch, error = quantile_sketch(data, return_error=True)
+    assert sketch == quantile_sketch(data) and error == 0
+    sketch, error = quantile_sketch(data, sample_size=5000,
+                                    max_exact_size=1000, return_error=True)
+    assert 0 < error < 0.05
+    assert abs(sketch[1] - 1000) <= error * data.size
+    _, error = quantile_sketch(data.chunk(50), return_error=True)
+    assert error is None
@@ -0,0 +1,52 @@
+import cftime
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+from . import data
+from ..lookup import CoordLookup, nearest_positions
+
+
+def test_nearest_positions_numeric():
+    index = pd.Index([0., 10., 20.])
+    np.testing.assert_array_equal(nearest_positions(index, [12, -3, 19, 10]),
+                                  [1, 0, 2, 1])
+    np.testing.assert_array_equal(nearest_positions(index[::-1], [12]), [1])
+    unsorted = pd.Index([10., 0., 20.])
+    np.testing.assert_array_equal(nearest_positions(unsorted, [1, 16]), [1, 2])
+    np.testing.assert_array_equal(nearest_positions(pd.Index([5]), [9]), [0])
+
+
+def test_nearest_positions_datetime():
+    index = pd.date_range('2000-01-01', periods=4, freq='D')
+    values = [np.datetime64('2000-01-02T13'), '2000-01-01',
+              pd.Timestamp('2001-01-01')]
+    np.testing.assert_array_equal(nearest_positions(index, values), [2, 0, 3])
+    # taps on a datetime axis give milliseconds since the epoch
+    ms = pd.Timestamp('2000-01-03T01').value // 10**6
+    np.testing.assert_array_equal(nearest_positions(index, [ms]), [2])
+
+
+def test_nearest_positions_cftime():
+    index = xr.cftime_range('2000-01-01', periods=4, freq='D',
+                            calendar='noleap')
+    values = [cftime.DatetimeNoLeap(2000, 1, 2, 13),
+              cftime.DatetimeNoLeap(1999, 1, 1)]
+    np.testing.assert_array_equal(nearest_positions(index, values), [2, 0])
+
+
+def test_nearest_positions_names():
+    index = pd.Index(['b', 'a', 'c'])
+    np.testing.assert_array_equal(nearest_positions(index, ['c', 'b']),
+                                  [2, 0])
+    with pytest.raises(KeyError):
+        nearest_positions(index, ['d'])
+
+
+def test_coord_lookup(data):
+    lookup = CoordLookup(data)
+    np.testing.assert_array_equal(lookup.positions('time', data.time[[2, 1]]),
+                                  [2, 1])
+    assert 'time' in lookup.indexes
+    sigma = data.sigma.values
+    assert lookup.positions('sigma', [sigma[3] + 1e-3])[0] == 3
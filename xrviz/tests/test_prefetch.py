@@ -0,0 +1,60 @@
+import threading
+import numpy as np
+import xarray as xr
+import pytest
+from ..cache import LRUCache
+from ..prefetch import upcoming, FramePrefetcher, PrefetchedFrames
+
+
+@pytest.mark.parametrize('index,step,loop,expected',
+                         [(2, 1, False, [3, 4]),
+                          (2, -1, False, [1, 0]),
+                          (3, 1, True, [4, 0, 1, 2])])
+def test_upcoming(index, step, loop, expected):
+    assert upcoming(index, 5, step=step, count=4, loop=loop) == expected
+
+
+def test_prefetcher_computes_each_frame_once():
+    calls = []
+
+    def compute(i):
+        calls.append(i)
+        return np.full(3, i)
+
+    prefetcher = FramePrefetcher(LRUCache(max_bytes=1000))
+    prefetcher.prefetch([(i, lambda i=i: compute(i)) for i in range(3)])
+    for i in range(3):
+        assert prefetcher.get(i, lambda i=i: compute(i))[0] == i
+    assert sorted(calls) == [0, 1, 2]
+
+
+def test_prefetcher_drops_queued_work():
+    release = threading.Event()
+    prefetcher = FramePrefetcher(ahead=4, max_workers=1)
+    prefetcher.prefetch([('busy', lambda: release.wait() and np.zeros(1)),
+                         ('queued', lambda: np.zeros(1))])
+    # jumping elsewhere drops the frames which have not started yet
+    prefetcher.prefetch([('other', lambda: np.ones(1))])
+    assert 'queued' not in prefetcher.pending
+    release.set()
+    assert prefetcher.get('other', lambda: None)[0] == 1
+    assert 'queued' not in prefetcher.cache
+
+
+def test_prefetched_frames():
+    data = xr.DataArray(np.arange(24.).reshape(4, 2, 3),
+                        dims=['time', 'y', 'x'],
+                        coords={'time': [10, 20, 30, 40]},
+                        name='var').chunk({'time': 2})
+    prefetcher = FramePrefetcher()
+    frames = PrefetchedFrames(data, ['time'], prefetcher)
+    out = frames.to_xarray()
+    xr.testing.assert_identical(out.compute(), data.compute())
+
+    key, compute = frames.task({'time': 30})
+    prefetcher.prefetch([(key, compute)])
+    np.testing.assert_array_equal(out.sel(time=30).values,
+                                  data.sel(time=30).values)
+    np.testing.assert_array_equal(out.isel(time=2, x=1).values,
+                                  data.isel(time=2, x=1).values)
+    assert key in prefetcher.cache
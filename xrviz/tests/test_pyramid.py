@@ -0,0 +1,56 @@
+import numpy as np
+import xarray as xr
+from ..cache import LRUCache
+from ..pyramid import coarsen_mean, pyramid_factor, Pyramid
+from ..utils import is_regular
+
+
+def frame(ny=6, nx=9):
+    return xr.DataArray(np.arange(ny * nx, dtype=float).reshape(ny, nx),
+                        dims=('ny', 'nx'),
+                        coords={'ny': np.arange(ny) * 0.5,
+                                'nx': 10 + np.arange(nx) * 2.})
+
+
+def test_coarsen_mean():
+    data = frame()
+    data[0, 0] = np.nan
+    coarse = coarsen_mean(data, ['ny', 'nx'])
+    # the last column is padded
+    assert coarse.shape == (3, 5)
+    assert coarse[0, 0] == np.nanmean(data[:2, :2])
+    assert coarse[1, 4] == data[2:4, 8].mean()
+    np.testing.assert_allclose(coarse.nx, 11 + np.arange(5) * 4.)
+    assert is_regular(coarse.nx) and is_regular(coarse.ny)
+
+
+def test_coarsen_mean_all_nan_block():
+    data = frame()
+    data[:2, :2] = np.nan
+    coarse = coarsen_mean(data, ['ny', 'nx'])
+    assert np.isnan(coarse[0, 0]) and not np.isnan(coarse[0, 1])
+
+
+def test_coarsen_mean_2d_coords():
+    data = frame(4, 4)
+    lon = data.nx + 0 * data.ny
+    data = data.assign_coords(lon=lon)
+    coarse = coarsen_mean(data, ['ny', 'nx'])
+    np.testing.assert_allclose(coarse.lon, lon.coarsen(ny=2, nx=2).mean())
+
+
+def test_pyramid_factor():
+    assert pyramid_factor([1440, 720], 300) == 2
+    assert pyramid_factor([4000, 4000], 450) == 8
+    assert pyramid_factor([500, 5000], 450) == 1
+
+
+def test_pyramid_levels_built_from_finer_ones():
+    data = frame(64, 64)
+    pyramid = Pyramid(LRUCache())
+    level = pyramid.level(data, ('frame',), ['ny', 'nx'], 4)
+    assert level.shape == (16, 16)
+    np.testing.assert_allclose(level, data.coarsen(ny=4, nx=4).mean())
+    assert set(pyramid.cache._data) == {('frame', 2), ('frame', 4)}
+    assert pyramid.level(data, ('frame',), ['ny', 'nx'], 4) is level
+    assert pyramid.level(data, ('frame',), ['ny', 'nx'], 1) is data
@@ -0,0 +1,59 @@
+import datashader
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+from ..raster import mesh_partitions, rasterize_mesh
+
+
+def datashader_works():
+    # releases of datashader older than the installed numpy may fail
+    try:
+        datashader.Canvas(2, 2).points(pd.DataFrame({'x': [0.], 'y': [0.]}),
+                                       'x', 'y')
+        return True
+    except Exception:
+        return False
+
+
+def mesh(ny=60, nx=80):
+    j, i = np.mgrid[0:ny, 0:nx]
+    lon = -90 + i * 0.05 + j * 0.01
+    lat = 40 + j * 0.03 + i * 0.002
+    return xr.DataArray(np.sin(lon) + np.cos(lat), dims=('ny', 'nx'),
+                        name='var', coords={'lon': (('ny', 'nx'), lon),
+                                            'lat': (('ny', 'nx'), lat)})
+
+
+def test_mesh_partitions():
+    data = mesh()
+    parts = mesh_partitions(data, 'lon', 'lat', n_parts=4)
+    assert parts.chunks == ((15, 15, 15, 15), (80,))
+    assert parts.lon.chunks == parts.chunks == parts.lat.chunks
+    xr.testing.assert_identical(parts.compute(), data)
+
+
+def test_mesh_partitions_keep_chunks():
+    data = mesh().chunk({'ny': 20, 'nx': 40}).transpose(
+        'nx', 'ny', transpose_coords=False)
+    parts = mesh_partitions(data, 'lon', 'lat', n_parts=4)
+    assert parts.dims == ('ny', 'nx')
+    assert parts.chunks == ((20, 20, 20), (40, 40))
+    assert parts.lat.chunks == parts.chunks
+
+
+@pytest.mark.skipif(not datashader_works(),
+                    reason='datashader does not work with this numpy')
+def test_rasterize_mesh():
+    data = mesh()
+    raster = rasterize_mesh(data, 'lon', 'lat', 40, 30, n_parts=4)
+    assert raster.dims == ('lat', 'lon')
+    assert raster.shape == (30, 40)
+    canvas = datashader.Canvas(40, 30, x_range=(data.lon.values.min(),
+                                                data.lon.values.max()),
+                               y_range=(data.lat.values.min(),
+                                        data.lat.values.max()))
+    expected = canvas.quadmesh(data, 'lon', 'lat', datashader.mean('var'))
+    close = np.isclose(raster, expected, equal_nan=True)
+    # cells on the edges of the mesh may be extended differently
+    assert close.mean() > 0.99
@@ -0,0 +1,100 @@
+import numpy as np
+import xarray as xr
+from ..region import region_mask, mask_box, region_stats
+
+
+def grid():
+    x = xr.DataArray(np.arange(10.), dims='nx')
+    y = xr.DataArray(np.arange(8.), dims='ny')
+    data = xr.DataArray(np.random.rand(5, 8, 10), dims=('time', 'ny', 'nx'))
+    return x, y, data
+
+
+def test_region_mask_box():
+    x, y, _ = grid()
+    # bounds may be given in any order
+    mask = region_mask(x, y, bounds=(6.5, 5, 2, 3))
+    assert mask.dims == ('nx', 'ny')
+    assert mask.sum() == 5 * 3
+    assert mask.sel(nx=3, ny=4) and not mask.sel(nx=7, ny=4)
+
+
+def test_region_mask_polygon():
+    x, y, _ = grid()
+    triangle = [(0, 0), (8, 0), (0, 8)]
+    mask = region_mask(x, y, polygon=triangle)
+    expected = (x + y < 8) & (x > 0) & (y > 0)
+    assert (mask[1:, 1:] == expected.transpose(*mask.dims)[1:, 1:]).all()
+    assert mask.sel(nx=1, ny=1) and not mask.sel(nx=5, ny=5)
+
+
+def test_region_mask_2d_coords():
+    lon = xr.DataArray(np.random.rand(4, 6) * 10, dims=('ny', 'nx'))
+    lat = xr.DataArray(np.random.rand(4, 6) * 10, dims=('ny', 'nx'))
+    mask = region_mask(lon, lat, bounds=(2, 2, 8, 8))
+    expected = (lon >= 2) & (lon <= 8) & (lat >= 2) & (lat <= 8)
+    assert (mask == expected).all()
+
+
+def test_mask_box():
+    x, y, _ = grid()
+    mask = region_mask(x, y, bounds=(2, 3, 6.5, 5))
+    assert mask_box(mask) == {'nx': slice(2, 7), 'ny': slice(3, 6)}
+
+
+def test_region_stats():
+    x, y, data = grid()
+    mask = region_mask(x, y, bounds=(2, 3, 6, 5))
+    stats = region_stats(data, mask)
+    inside = data.isel(nx=slice(2, 7), ny=slice(3, 6))
+    for name in ['mean', 'min', 'max', 'std']:
+        np.testing.assert_allclose(stats[name],
+                                   getattr(inside, name)(['ny', 'nx']))
+    assert stats['mean'].dims == ('time',)
+
+
+def test_region_stats_weighted():
+    x, y, data = grid()
+    mask = region_mask(x, y, bounds=(2, 3, 6, 5))
+    weights = xr.DataArray(np.arange(8.), dims='ny')
+    stats = region_stats(data, mask, weights)
+    inside = data.isel(nx=slice(2, 7), ny=slice(3, 6))
+    w = weights[3:6]
+    np.testing.assert_allclose(stats['mean'], inside.weighted(w).mean(
+        ['ny', 'nx']))
+    np.testing.assert_allclose(stats['std'], inside.weighted(w).std(
+        ['ny', 'nx']))
+
+
+def test_region_stats_std_with_offset():
+    # e.g. temperatures in K, whose variations are small against their mean
+    x, y, data = grid()
+    data = (280 + data * 1e-2).astype('float32')
+    mask = region_mask(x, y, bounds=(2, 3, 6, 5))
+    stats = region_stats(data, mask)
+    inside = data.astype(float).where(mask)
+    np.testing.assert_allclose(stats['std'], inside.std(['ny', 'nx']),
+                               rtol=1e-3)
+
+
+def test_region_stats_dask_read_once():
+    from dask.callbacks import Callback
+    x, y, data = grid()
+    data = data.chunk({'time': 1})
+    computes = []
+
+    class CountComputes(Callback):
+        def _start(self, dsk):
+            computes.append(dsk)
+
+    with CountComputes():
+        stats = region_stats(data, region_mask(x, y, bounds=(2, 3, 6, 5)))
+    assert len(computes) == 1
+    assert isinstance(stats['mean'].data, np.ndarray)
+
+
+def test_region_stats_empty_region():
+    x, y, data = grid()
+    stats = region_stats(data, region_mask(x, y, bounds=(20, 20, 30, 30)))
+    assert stats['mean'].isnull().all()
+    assert stats['mean'].dims == ('time',)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+import xarray as xr
+from ..compatibility import pyproj
+from ..reproject import mesh_fingerprint, project_mesh, transform_points
+
+if pyproj is None:
+    pytest.skip("pyproj not present", allow_module_level=True)
+
+
+def test_transform_points():
+    xs, ys = transform_points([0., 180.], [0., 45.], 'EPSG:4326', 'EPSG:3857')
+    np.testing.assert_allclose(xs, [0, 20037508.34], rtol=1e-9)
+    np.testing.assert_allclose(ys, [0, 5621521.49], rtol=1e-9)
+    lon, lat = transform_points(xs, ys, 'EPSG:3857', 'EPSG:4326')
+    np.testing.assert_allclose(lon, [0, 180], atol=1e-9)
+    np.testing.assert_allclose(lat, [0, 45], atol=1e-9)
+
+
+def test_transform_points_outside_domain():
+    xs, ys = transform_points([0., 0.], [0., 100.], 'EPSG:4326', 'EPSG:3857')
+    assert np.isfinite(xs[0]) and np.isfinite(ys[0])
+    assert np.isnan(xs[1]) and np.isnan(ys[1])
+
+
+def test_project_mesh():
+    lon = xr.DataArray(np.arange(-80., -70.), dims='lon')
+    lat = xr.DataArray(np.arange(40., 45.), dims='lat')
+    mesh = project_mesh(lon, lat, 'EPSG:4326', 'EPSG:3857')
+    assert mesh['x'].dims == mesh['y'].dims == ('lon', 'lat')
+    assert mesh['x'].shape == (10, 5)
+    xs, ys = transform_points(-75., 42., 'EPSG:4326', 'EPSG:3857')
+    assert mesh['x'][5, 2] == xs and mesh['y'][5, 2] == ys
+
+
+def test_mesh_fingerprint():
+    lon = xr.DataArray(np.arange(10.), dims='lon')
+    lat = xr.DataArray(np.arange(5.), dims='lat')
+    assert mesh_fingerprint(lon, lat) == mesh_fingerprint(lon.copy(),
+                                                          lat.copy())
+    assert mesh_fingerprint(lon, lat) != mesh_fingerprint(lon + 1, lat)
+    assert mesh_fingerprint(lon, lat) != mesh_fingerprint(lat, lon)
@@ -0,0 +1,75 @@
+import numpy as np
+import xarray as xr
+from ..spatial import NearestCell, is_latitude, unit_vectors
+
+
+def grid(lon, lat):
+    lon, lat = np.meshgrid(lon, lat)
+    return (xr.DataArray(lon, dims=['ny', 'nx']),
+            xr.DataArray(lat, dims=['ny', 'nx']))
+
+
+def test_unit_vectors():
+    np.testing.assert_allclose(unit_vectors(0, 0), [1, 0, 0], atol=1e-12)
+    np.testing.assert_allclose(unit_vectors(90, 0), [0, 1, 0], atol=1e-12)
+    np.testing.assert_allclose(unit_vectors(0, 90), [0, 0, 1], atol=1e-12)
+
+
+def test_nearest_cell():
+    lon, lat = grid(np.arange(-180., 180., 10.), np.arange(-80., 90., 10.))
+    index = NearestCell(lon, lat.rename('lat'))
+    assert index.geographic
+    assert index.query(21, 39) == {'ny': 12, 'nx': 20}
+    # across the antimeridian, 179 is closer to -180 than to 170
+    assert index.query(179, 0) == {'ny': 8, 'nx': 0}
+
+
+def test_nearest_cell_skips_nan_and_transposed_lat():
+    lon, lat = grid([0., 1., 2.], [0., 1.])
+    lon[0, 0] = np.nan
+    index = NearestCell(lon, lat.transpose())
+    assert index.query(0, 0) == {'ny': 0, 'nx': 1}
+
+
+def test_nearest_cell_without_tree():
+    lon, lat = grid(np.arange(0., 10.), np.arange(0., 5.))
+    index = NearestCell(lon, lat)
+    index.tree = None
+    assert index.query(6.9, 2.2) == {'ny': 2, 'nx': 7}
+
+
+def test_is_latitude():
+    lon, lat = grid([0.], [0.])
+    assert is_latitude(lat.rename('lat'))
+    assert is_latitude(lat.assign_attrs(units='degrees_north'))
+    assert not is_latitude(lon.rename('lon'))
+
+
+def test_nearest_cell_with_differing_dims():
+    lon = xr.DataArray(np.arange(0., 5.), dims=['nx'])
+    lat = xr.DataArray(np.arange(0., 3.)[:, None] + 0.1 * lon.values,
+                       dims=['ny', 'nx'])
+    index = NearestCell(lon, lat)
+    assert index.query(3.1, 1.35) == {'nx': 3, 'ny': 1}
+
+
+def test_nearest_cell_many_points():
+    lon, lat = grid(np.arange(0., 10.), np.arange(0., 5.))
+    index = NearestCell(lon, lat)
+    cells = index.query(np.array([6.9, 1.2]), np.array([2.2, 4.4]))
+    np.testing.assert_array_equal(cells['ny'], [2, 4])
+    np.testing.assert_array_equal(cells['nx'], [7, 1])
+
+
+
+def test_nearest_cell_planar():
+    # a projected grid in metres, rotated so that it is curvilinear
+    j, i = np.mgrid[0:20, 0:30] * 5000.
+    x = xr.DataArray(i * 0.8 - j * 0.6 + 3e5, dims=['ny', 'nx'], name='x')
+    y = xr.DataArray(i * 0.6 + j * 0.8 + 4e6, dims=['ny', 'nx'], name='y')
+    index = NearestCell(x, y)
+    assert not index.geographic
+    point = (x.values[7, 12] + 1000, y.values[7, 12] - 1000)
+    assert index.query(*point) == {'ny': 7, 'nx': 12}
+    index.tree = None
+    assert index.query(*point) == {'ny': 7, 'nx': 12}
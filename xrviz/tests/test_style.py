@@ -56,6 +56,27 @@ def test_upper_limit(style):
     assert u_lim_widget.width == 140
 
 
+def test_limits_error(style):
+    error_widget = style.limits_error
+    assert isinstance(error_widget, pn.widgets.StaticText)
+    assert error_widget.name == 'cmap limits error'
+    assert error_widget.value == ''
+
+
+def test_sample_size(style):
+    size_widget = style.sample_size
+    assert isinstance(size_widget, pn.widgets.IntInput)
+    assert size_widget.name == 'cmap sample size'
+    assert size_widget.value == 100000
+
+
+def test_max_exact_size(style):
+    size_widget = style.max_exact_size
+    assert isinstance(size_widget, pn.widgets.IntInput)
+    assert size_widget.name == 'cmap exact size'
+    assert size_widget.value == 1000000
+
+
 def test_use_all_data(style):
     use_data_widget = style.use_all_data
     assert isinstance(use_data_widget, pn.widgets.Checkbox)
@@ -85,3 +106,11 @@ def test_setup(style):
     style._emit('clear_cmap_limits', '')
     assert style.lower_limit.value is ''
     assert style.upper_limit.value is ''
+
+
+def test_sample_size_clears_limits(style):
+    style.lower_limit.value = '123'
+    style.limits_error.value = 'exact'
+    style.sample_size.value = 1000
+    assert style.lower_limit.value == ''
+    assert style.limits_error.value == ''
@@ -1,7 +1,8 @@
 import panel as pn
 import pytest
 from panel.widgets import DiscretePlayer, DiscreteSlider, Select
-from ..utils import convert_widget, player_with_name_and_value
+import numpy as np
+from ..utils import convert_widget, player_with_name_and_value, is_regular
 
 
 @pytest.mark.parametrize("source_widget,target_widget",
@@ -41,3 +42,15 @@ def test_player_with_name_and_value():
     player.value = 'c'
     out_markdown_value = out[0][1]
     assert out_markdown_value.object == player.value
+
+
+def test_is_regular():
+    assert is_regular(np.arange(-180, 180, 0.25))
+    assert is_regular(np.linspace(90, -90, 721, dtype='float32'))
+    assert is_regular(np.arange('2019-01-01', '2019-02-01',
+                                dtype='datetime64[h]'))
+    assert not is_regular(np.array([0, 1, 2, 4]))
+    assert not is_regular(np.array([0, 1, 1, 2]))
+    assert not is_regular(np.array([3.]))
+    assert not is_regular(np.array(['a', 'b', 'c']))
+    assert not is_regular(np.ones((2, 3)))
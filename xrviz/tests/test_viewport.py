@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import xarray as xr
+from ..viewport import range_slice, BoxIndex
+
+
+def test_range_slice():
+    index = pd.Index(np.arange(0., 100.))
+    assert range_slice(index, 20, 40, margin=0) == slice(19, 42)
+    assert range_slice(index, 40, 20) == slice(17, 44)
+    assert range_slice(index, -50, 500) == slice(0, 100)
+
+
+def test_range_slice_decreasing():
+    index = pd.Index(np.linspace(90, -90, 181))
+    # latitudes 40 to 20 are at positions 50 to 70
+    assert range_slice(index, 20, 40, margin=0) == slice(49, 72)
+
+
+def test_range_slice_datetimes():
+    index = pd.date_range('2019-01-01', periods=48, freq='H')
+    # bokeh gives datetime ranges in milliseconds since the epoch
+    lower, upper = (pd.Timestamp(t).value // 10**6 for t in
+                    ['2019-01-01T10', '2019-01-01T20'])
+    assert range_slice(index, lower, upper, margin=0) == slice(9, 22)
+
+
+def test_box_index():
+    ny, nx = 200, 300
+    lon = xr.DataArray(np.linspace(-100, -70, nx) + np.zeros((ny, 1)) +
+                       np.linspace(0, 2, ny)[:, None], dims=('ny', 'nx'))
+    lat = xr.DataArray(np.linspace(30, 50, ny)[:, None] + np.zeros(nx),
+                       dims=('ny', 'nx'))
+    index = BoxIndex(lon, lat, tile=16)
+    x_range, y_range = (-90, -85), (40, 42)
+    box = index.query(x_range, y_range, margin=0)
+    inside = ((lon >= -90) & (lon <= -85) & (lat >= 40) & (lat <= 42))
+    # all the cells in view are in the box
+    assert inside.isel(box).sum() == inside.sum()
+    assert all(sl.start % 16 == 0 for sl in box.values())
+    assert box['nx'].stop - box['nx'].start < nx / 2
+    wider = index.query(x_range, y_range)
+    assert wider['nx'].start == box['nx'].start - 16
+
+
+def test_box_index_nothing_in_view():
+    lon = xr.DataArray(np.arange(10.), dims='nx')
+    lat = xr.DataArray(np.arange(20.), dims='ny')
+    lon = lon.where(lon < 8)
+    index = BoxIndex(lon, lat, tile=4)
+    assert index.query((8.5, 20), (0, 5)) == {'nx': slice(0, 4),
+                                              'ny': slice(0, 4)}
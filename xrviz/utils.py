@@ -1,4 +1,5 @@
 import inspect
+import numpy as np
 import panel as pn
 from .compatibility import ccrs, has_cartopy
 
@@ -86,6 +87,27 @@ def is_float(a):
     except:
         return False
 
+
+def is_regular(values, rtol=1e-3):
+    """
+    Whether 1-D coordinate ``values`` are evenly spaced, i.e. each step
+    differs from the mean step by no more than ``rtol`` times it, so that
+    they can be plotted as the pixels of an image.
+
+    Numeric and ``datetime64`` values are supported. Values with fewer
+    than two labels, or which are not strictly monotonic, are not regular.
+    """
+    values = np.asarray(values)
+    if values.ndim != 1 or len(values) < 2:
+        return False
+    if values.dtype.kind == 'M':
+        values = values.astype('datetime64[ns]').astype(np.int64)
+    elif values.dtype.kind not in 'iuf':
+        return False
+    steps = np.diff(values.astype(float))
+    step = (values[-1] - values[0]) / (len(values) - 1)
+    return bool(step != 0 and np.all(np.abs(steps - step) <= rtol * abs(step)))
+
 if has_cartopy:
     def proj_params(proj):
         proj = getattr(ccrs, proj)
@@ -0,0 +1,85 @@
+import numpy as np
+import xarray as xr
+from .lookup import nearest_positions
+
+
+def range_slice(index, lower, upper, margin=0.1):
+    """
+    The ``isel`` slice of the labels of a monotonic ``index`` between
+    ``lower`` and ``upper``, found by binary search.
+
+    The slice is widened on each side by ``margin`` times its length, and
+    by at least one label, so that the edges of the viewport are covered
+    and a short pan does not leave them empty.
+
+    Parameters
+    ----------
+    index: pandas.Index
+        Sorted in either order.
+    lower, upper: scalars
+        As given by a ``RangeXY`` stream, see ``lookup.coerce_values``.
+    """
+    start, stop = sorted(nearest_positions(index, [lower, upper]))
+    pad = 1 + int(margin * (stop - start))
+    return slice(max(start - pad, 0), min(stop + pad + 1, len(index)))
+
+
+class BoxIndex(object):
+    """
+    Find the cells of a grid with multi-dimensional coordinates which are
+    in a viewport.
+
+    The grid is split into tiles of ``tile`` cells along each dim, and the
+    bounding box of the coordinates of each tile is kept, so that a query
+    only compares the viewport with the boxes of the tiles, instead of
+    with the coordinates of every cell. Cells with NaN coordinates are
+    ignored.
+
+    Parameters
+    ----------
+    x, y: xarray.DataArray
+        The coordinates of the cells, which are broadcast against each
+        other.
+    tile: int
+    """
+
+    def __init__(self, x, y, tile=64):
+        x, y = xr.broadcast(x, y)
+        y = y.transpose(*x.dims)
+        self.dims = x.dims
+        self.shape = x.shape
+        self.tile = tile
+        self.x_min, self.x_max = self._tile_bounds(x)
+        self.y_min, self.y_max = self._tile_bounds(y)
+
+    def _tile_bounds(self, coord):
+        low = high = np.asarray(coord, dtype=float)
+        for axis, size in enumerate(self.shape):
+            starts = np.arange(0, size, self.tile)
+            low = np.fmin.reduceat(low, starts, axis=axis)
+            high = np.fmax.reduceat(high, starts, axis=axis)
+        return low, high
+
+    def query(self, x_range, y_range, margin=1):
+        """
+        The ``isel`` slices, along ``dims``, of the smallest box of tiles
+        holding all the cells in the viewport, widened by ``margin`` tiles
+        on each side.
+
+        If no cell is in the viewport, the first tile is returned, so that
+        there is still a valid, if small, grid to plot.
+        """
+        (x0, x1), (y0, y1) = sorted(x_range), sorted(y_range)
+        hits = ((self.x_max >= x0) & (self.x_min <= x1) &
+                (self.y_max >= y0) & (self.y_min <= y1))
+        box = {}
+        for axis, (dim, size) in enumerate(zip(self.dims, self.shape)):
+            others = tuple(a for a in range(hits.ndim) if a != axis)
+            tiles = np.flatnonzero(hits.any(axis=others))
+            if not len(tiles):
+                return {dim: slice(0, min(self.tile, size))
+                        for dim, size in zip(self.dims, self.shape)}
+            start = max(tiles[0] - margin, 0) * self.tile
+            stop = min((tiles[-1] + 1 + margin) * self.tile, size)
+            box[dim] = slice(start, stop)
+        return box